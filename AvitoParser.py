@@ -1,4 +1,5 @@
 import asyncio
+import multiprocessing
 import threading
 import time
 import os
@@ -11,8 +12,9 @@ from dto import AvitoConfig
 from integrations.notifications.factory import build_notifier
 from lang import *
 from load_config import save_avito_config, load_avito_config
-from parser_cls import AvitoParse
+from parser_cls import AvitoParse, load_peer_viewed
 from utils import prompt_user_login
+from utils.file_log import setup_file_log
 from version import VERSION
 
 
@@ -246,6 +248,7 @@ def main(page: ft.Page):
         stop_btn.visible = True
         is_run = True
         page.update()
+        load_peer_viewed(load_avito_config("config.toml"))
         while is_run and not stop_event.is_set():
             run_process()
             if not is_run:
@@ -742,7 +745,11 @@ def main(page: ft.Page):
     logger_console_init()
 
 
-ft.app(
-    target=main,
-    assets_dir="assets",
-)
+if __name__ == "__main__":
+    # нужно для процессов-воркеров (workers > 1) в собранном exe
+    multiprocessing.freeze_support()
+    setup_file_log()
+    ft.app(
+        target=main,
+        assets_dir="assets",
+    )
@@ -0,0 +1,83 @@
+"""
+Разбор ответа API каталога от байтов до объявлений: скорость (МБ/сек, объявлений/сек) и память
+
+    python benchmarks/catalog_decoding.py                        # синтетический ответ на 50 объявлений
+    python benchmarks/catalog_decoding.py page1.json page2.json  # сохранённые ответы API каталога
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.item_decoding import synthetic_item  # noqa: E402
+from models import decode_items  # noqa: E402
+from parser.catalog import CatalogLocator, find_catalog, loads, orjson  # noqa: E402
+from utils.enrich import enrich_ads  # noqa: E402
+
+
+def load_payloads(paths: list[str]) -> list[bytes]:
+    if not paths:
+        payload = {"status": "ok", "result": {"catalog": {"items": [synthetic_item(index) for index in range(50)]}}}
+        return [json.dumps(payload, ensure_ascii=False).encode()]
+    return [Path(path).read_bytes() for path in paths]
+
+
+def stdlib_full(raw: bytes):
+    return enrich_ads(decode_items(find_catalog(json.loads(raw))[1]))
+
+
+def stdlib_lazy(raw: bytes):
+    return enrich_ads(decode_items(find_catalog(json.loads(raw))[1], lazy=True))
+
+
+locator = CatalogLocator()
+
+
+def fast_path(raw: bytes):
+    """Как в парсере: loads (orjson) + путь к каталогу из кэша + LazyItem"""
+    return enrich_ads(decode_items(locator.locate("bench", loads(raw)), lazy=True))
+
+
+def measure(decode, payloads: list[bytes], rounds: int) -> tuple[float, float, float, float]:
+    size = sum(len(raw) for raw in payloads)
+    items = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for raw in payloads:
+            items += len(decode(raw))
+    elapsed = time.perf_counter() - started
+
+    # память на одну страницу: пик при разборе и сколько занимает результат
+    tracemalloc.start()
+    ads = decode(payloads[0])
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ads
+    return size * rounds / elapsed, items / elapsed, peak, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("payloads", nargs="*", help="json-ответы API каталога")
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.payloads)
+    print(f"Ответов: {len(payloads)}, в среднем {sum(map(len, payloads)) / len(payloads) / 1024:.0f} КБ, "
+          f"orjson {'есть' if orjson is not None else 'не установлен'}")
+    for name, decode in (
+            ("json + Item", stdlib_full),
+            ("json + LazyItem", stdlib_lazy),
+            ("быстрый путь", fast_path),
+    ):
+        speed, items, peak, kept = measure(decode, payloads, args.rounds)
+        print(f"{name:16} {speed / 1024 / 1024:7.1f} МБ/сек {items:9.0f} объявлений/сек  "
+              f"пик {peak / 1024:6.0f} КБ, результат {kept / 1024:6.0f} КБ на страницу")
+
+
+if __name__ == "__main__":
+    main()
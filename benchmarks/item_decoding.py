@@ -0,0 +1,127 @@
+"""
+Скорость валидации объявлений: Item против LazyItem
+
+    python benchmarks/item_decoding.py                      # синтетическая страница на 50 объявлений
+    python benchmarks/item_decoding.py page1.json page2.json  # сохранённые ответы API каталога
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import decode_items  # noqa: E402
+
+
+def synthetic_item(index: int) -> dict:
+    return {
+        "id": 4_000_000_000 + index,
+        "categoryId": 24,
+        "locationId": 637640,
+        "isVerifiedItem": False,
+        "urlPath": f"/moskva/telefony/iphone_16_{4_000_000_000 + index}",
+        "title": f"iPhone 16 128GB #{index}",
+        "description": "Отличное состояние, полный комплект, гарантия. " * 5,
+        "category": {
+            "id": 84, "name": "Мобильные телефоны", "slug": "mobilnye_telefony",
+            "rootId": 6, "compare": False, "pageRootId": None,
+        },
+        "location": {
+            "id": 637640, "name": "Москва", "namePrepositional": "Москве",
+            "isCurrent": True, "isRegion": False,
+        },
+        "addressDetailed": {"locationName": "Москва"},
+        "sortTimeStamp": 1_760_000_000_000 - index * 60_000,
+        "turnOffDate": False,
+        "priceDetailed": {
+            "enabled": True, "fullString": "75 000 ₽", "hasValue": True, "postfix": "",
+            "string": "75 000 ₽", "stringWithoutDiscount": None, "title": {"full": "75 000 ₽"},
+            "titleDative": "75 000 ₽", "value": 75_000 + index, "wasLowered": False, "exponent": "",
+        },
+        "images": [
+            {
+                size: f"https://00.img.avito.st/image/1/{index}/{n}/{size}.jpg"
+                for size in ("208x156", "236x177", "318x238", "416x312", "432x324", "472x354", "636x476", "864x648")
+            }
+            for n in range(5)
+        ],
+        "imagesCount": 5,
+        "isFavorite": False,
+        "isNew": False,
+        "geo": {"geoReferences": [{"content": "м. Тверская"}], "formattedAddress": "Москва, Тверская ул."},
+        "contacts": {
+            "phone": True, "delivery": True, "message": True, "messageTitle": "Написать",
+            "action": "show", "onModeration": False, "hasCVPackage": False,
+            "hasEmployeeBalanceForCv": False, "serviceBooking": False,
+        },
+        "gallery": {
+            "alt": None, "cropImagesInfo": None, "extraPhoto": None, "hasLeadgenOverlay": False,
+            "has_big_image": True, "imageAlt": "iPhone", "imageLargeUrl": "https://a/1.jpg",
+            "imageLargeVipUrl": "https://a/2.jpg", "imageUrl": "https://a/3.jpg", "imageVipUrl": "https://a/4.jpg",
+            "image_large_urls": ["https://a/1.jpg"] * 5, "image_urls": ["https://a/3.jpg"] * 5,
+            "images": [{"208x156": "https://a/3.jpg"}] * 5, "imagesCount": 5,
+            "isFirstImageHighImportance": True, "isLazy": False, "noPhoto": False, "showSlider": True,
+            "wideSnippetUrls": [],
+        },
+        "userLogo": {"link": f"/brands/shop_{index % 7}", "src": "https://a/logo.png", "developerId": None},
+        "iva": {
+            "DateInfoStep": [{
+                "componentData": {"component": "date-info"},
+                "payload": {"vas": [{"title": "Продвинуто"}] if index % 10 == 0 else []},
+                "default": False,
+            }],
+            "BadgeBarStep": [{
+                "componentData": {"component": "badge-bar", "payload": {"badges": [{"title": "Надёжный"}]}},
+                "payload": None,
+                "default": True,
+            }],
+        },
+        "coords": {"lat": 55.75, "lng": 37.61, "address_user": "Тверская ул."},
+        "isReserved": False,
+    }
+
+
+def load_catalogs(paths: list[str]) -> list[dict]:
+    if not paths:
+        return [{"items": [synthetic_item(index) for index in range(50)]}]
+
+    catalogs = []
+    for path in paths:
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        result = payload.get("result") if isinstance(payload.get("result"), dict) else {}
+        for candidate in (payload.get("catalog"), result.get("catalog"), result, payload):
+            if isinstance(candidate, dict) and isinstance(candidate.get("items"), list):
+                catalogs.append(candidate)
+                break
+    return catalogs
+
+
+def measure(catalogs: list[dict], lazy: bool, rounds: int) -> float:
+    items = sum(len(catalog["items"]) for catalog in catalogs)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for catalog in catalogs:
+            ads = decode_items(catalog, lazy=lazy)
+            # то, что читает парсер на каждое объявление
+            for ad in ads:
+                _ = (ad.id, ad.priceDetailed.value, ad.sortTimeStamp, ad.title, ad.description, ad.isReserved)
+    return items * rounds / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("payloads", nargs="*", help="json-ответы API каталога")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    catalogs = load_catalogs(args.payloads)
+    full = measure(catalogs, lazy=False, rounds=args.rounds)
+    lazy = measure(catalogs, lazy=True, rounds=args.rounds)
+    print(f"Item:     {full:10.0f} объявлений/сек")
+    print(f"LazyItem: {lazy:10.0f} объявлений/сек  (x{lazy / full:.2f})")
+
+
+if __name__ == "__main__":
+    main()
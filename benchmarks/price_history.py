@@ -0,0 +1,82 @@
+"""
+История цен: запись страницы и выборка снижений цены на миллионах строк
+
+    python benchmarks/price_history.py
+    python benchmarks/price_history.py --rows 10000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db_service import SQLitePriceHistory  # noqa: E402
+
+PAGE_SIZE = 50
+DROP_SHARE = 0.02  # доля строк со снижением цены
+
+
+def fill(history: SQLitePriceHistory, rows: int, days: int) -> None:
+    """rows изменений цен, равномерно за days дней"""
+    rnd = random.Random(1)
+    now = int(time.time())
+    conn = history._connection()
+    batch = 100_000
+    for start in range(0, rows, batch):
+        records = []
+        for i in range(min(batch, rows - start)):
+            price = rnd.randrange(1_000, 1_000_000)
+            prev = price * 2 if rnd.random() < DROP_SHARE else price // 2
+            records.append((4_000_000_000 + rnd.randrange(rows), price, prev, now - rnd.randrange(days * 86_400)))
+        with conn:
+            conn.executemany(
+                "INSERT INTO price_history (ad_id, price, prev_price, changed_at) VALUES (?, ?, ?, ?)",
+                records,
+            )
+    conn.execute("ANALYZE")
+
+
+def timed(fn, repeat: int) -> float:
+    """Среднее время вызова, мс"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = SQLitePriceHistory(db_name=os.path.join(tmp, "database.db"))
+        started = time.perf_counter()
+        fill(history, args.rows, args.days)
+        print(f"price_history на {args.rows} строк за {args.days} дней: {time.perf_counter() - started:.1f} сек.")
+
+        rnd = random.Random(2)
+        ids = [4_000_000_000 + rnd.randrange(args.rows) for _ in range(PAGE_SIZE)]
+        page = [
+            SimpleNamespace(id=ad_id, priceDetailed=SimpleNamespace(value=rnd.randrange(1_000, 1_000_000)))
+            for ad_id in ids
+        ]
+
+        print(f"Последние цены для страницы: {timed(lambda: history.last_prices(ids), args.repeat):.3f} мс")
+        for hours in (1, 24):
+            drops = len(history.drops(percent=30, hours=hours))
+            elapsed = timed(lambda: history.drops(percent=30, hours=hours), args.repeat)
+            print(f"Снижения > 30% за {hours} ч. ({drops} шт.): {elapsed:.3f} мс")
+        print(f"Запись страницы: {timed(lambda: history.record_page(page), 20):.3f} мс")
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Кэш просмотренных объявлений (фильтр Блума перед таблицей viewed):
+время загрузки при старте, память, реальная доля ложных срабатываний и скорость проверки страниц
+
+    python benchmarks/viewed_cache.py                # 5 млн записей
+    python benchmarks/viewed_cache.py --rows 1000000 --fp-rate 0.001
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db_service import SQLiteDBHandler  # noqa: E402
+
+PAGE_SIZE = 50
+
+
+def fill_db(path: str, rows: int) -> list[tuple[int, int]]:
+    rnd = random.Random(1)
+    sample = []
+    handler = SQLiteDBHandler(db_name=path, use_cache=False)
+    conn = handler._connection()
+    batch = 100_000
+    for start in range(0, rows, batch):
+        records = [
+            (4_000_000_000 + start + i, rnd.randrange(1_000, 1_000_000))
+            for i in range(min(batch, rows - start))
+        ]
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO viewed (id, price) VALUES (?, ?)", records)
+        sample.extend(records[:: max(1, rows // 10_000)])
+    handler.close()
+    return sample
+
+
+def new_handler(path: str, **kwargs) -> SQLiteDBHandler:
+    return SQLiteDBHandler(db_name=path, **kwargs)
+
+
+def pages(seen: list[tuple[int, int]], count: int, seen_share: float) -> list[list[tuple[int, int]]]:
+    """Страницы, на которых seen_share объявлений уже видели, остальные новые"""
+    rnd = random.Random(2)
+    seen_count = round(PAGE_SIZE * seen_share)
+    result = []
+    for _ in range(count):
+        page = rnd.sample(seen, seen_count)
+        page += [
+            (9_000_000_000 + rnd.randrange(10 ** 9), rnd.randrange(1_000, 1_000_000))
+            for _ in range(PAGE_SIZE - seen_count)
+        ]
+        result.append(page)
+    return result
+
+
+def measure_pages(handler: SQLiteDBHandler, test_pages) -> float:
+    started = time.perf_counter()
+    for page in test_pages:
+        handler.filter_unseen(page)
+    return len(test_pages) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--fp-rate", type=float, default=0.01)
+    parser.add_argument("--max-mb", type=int, default=64)
+    parser.add_argument("--pages", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "database.db")
+        started = time.perf_counter()
+        seen = fill_db(path, args.rows)
+        print(f"БД на {args.rows} записей создана за {time.perf_counter() - started:.1f} сек.")
+
+        started = time.perf_counter()
+        cached = new_handler(path, cache_fp_rate=args.fp_rate, cache_max_mb=args.max_mb)
+        print(f"Старт с кэшем: {time.perf_counter() - started:.2f} сек., "
+              f"фильтр {cached._bloom.size_bytes / 1024 / 1024:.1f} МБ")
+
+        rnd = random.Random(3)
+        probes = [(9_000_000_000 + rnd.randrange(10 ** 9), 1) for _ in range(200_000)]
+        false_positive = sum(probe in cached._bloom for probe in probes) / len(probes)
+        print(f"Ложные срабатывания: {false_positive:.4f} (настройка {args.fp_rate})")
+
+        mixes = {share: pages(seen, args.pages, share) for share in (0.0, 0.5, 1.0)}
+        with_cache = {share: measure_pages(cached, test_pages) for share, test_pages in mixes.items()}
+        cached.close()
+
+        plain = new_handler(path, use_cache=False)
+        without_cache = {share: measure_pages(plain, test_pages) for share, test_pages in mixes.items()}
+        plain.close()
+
+        for share in mixes:
+            print(f"Страницы по {PAGE_SIZE}, уже видели {share:.0%}: "
+                  f"без кэша {without_cache[share]:.0f}/сек, с кэшем {with_cache[share]:.0f}/сек")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Хранилища просмотренных (viewed_backend): скорость записи и проверки страниц на 1 и 10 млн записей
+
+    python benchmarks/viewed_store.py
+    python benchmarks/viewed_store.py --rows 1000000 --backends sqlite,memory
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db_service import SQLiteDBHandler  # noqa: E402
+from parser.viewed.dbm_store import DbmViewedStore  # noqa: E402
+from parser.viewed.memory import MemoryViewedStore  # noqa: E402
+
+PAGE_SIZE = 50
+INSERT_BATCH = 1_000
+
+
+def make_store(backend: str, directory: str):
+    if backend == "sqlite":
+        return SQLiteDBHandler(db_name=os.path.join(directory, "database.db"), use_cache=False)
+    if backend == "dbm":
+        return DbmViewedStore(path=os.path.join(directory, "viewed_dbm"))
+    return MemoryViewedStore()
+
+
+def fake_ad(record_id: int, price: int):
+    """Хранилищу от объявления нужны только id и цена"""
+    return SimpleNamespace(id=record_id, priceDetailed=SimpleNamespace(value=price))
+
+
+def fill(store, rows: int) -> tuple[float, list[tuple[int, int]]]:
+    rnd = random.Random(1)
+    sample = []
+    started = time.perf_counter()
+    for start in range(0, rows, INSERT_BATCH):
+        ads = [
+            fake_ad(4_000_000_000 + start + i, rnd.randrange(1_000, 1_000_000))
+            for i in range(min(INSERT_BATCH, rows - start))
+        ]
+        store.add_record_from_page(ads=ads)
+        sample.extend((ad.id, ad.priceDetailed.value) for ad in ads[:: max(1, rows // 10_000)])
+    store.close()
+    return rows / (time.perf_counter() - started), sample
+
+
+def lookup(store, seen: list[tuple[int, int]], pages: int) -> float:
+    """Страницы, на которых половину объявлений уже видели"""
+    rnd = random.Random(2)
+    test_pages = [
+        rnd.sample(seen, PAGE_SIZE // 2)
+        + [(9_000_000_000 + rnd.randrange(10 ** 9), 1) for _ in range(PAGE_SIZE - PAGE_SIZE // 2)]
+        for _ in range(pages)
+    ]
+    store.filter_unseen(test_pages[0])  # открытие файла не считаем
+    started = time.perf_counter()
+    for page in test_pages:
+        store.filter_unseen(page)
+    return pages * PAGE_SIZE / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="1000000,10000000", help="размеры через запятую")
+    parser.add_argument("--backends", default="sqlite,dbm,memory")
+    parser.add_argument("--pages", type=int, default=2_000)
+    args = parser.parse_args()
+
+    for rows in (int(value) for value in args.rows.split(",")):
+        for backend in args.backends.split(","):
+            with tempfile.TemporaryDirectory() as tmp:
+                store = make_store(backend, tmp)
+                insert_rate, seen = fill(store, rows)
+                lookup_rate = lookup(store, seen, args.pages)
+                store.close()
+            print(f"{backend:7} {rows:>10} записей: запись {insert_rate:10.0f}/сек, "
+                  f"проверка {lookup_rate:10.0f} объявлений/сек")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,603 @@
 import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator
 
+from loguru import logger
+
+from dto import PriceDrop
 from models import Item
+from parser.viewed.base import ViewedStore
+from utils.bloom import BloomFilter
+
+
+class SQLiteConnections:
+    """Одно долгоживущее подключение к файлу БД на поток"""
+    PRAGMAS = (
+        # до journal_mode: переход в WAL записывает заголовок файла, и для новой БД
+        # auto_vacuum уже не включить. У старых БД ничего не меняет до VACUUM
+        "PRAGMA auto_vacuum = INCREMENTAL",
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -16000",  # 16 МБ
+    )
+
+    def __init__(self, db_name="database.db"):
+        self.db_name = db_name
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
 
+    def _open_connection(self) -> sqlite3.Connection:
+        # check_same_thread=False только для close() из другого потока,
+        # запросы каждый поток делает через своё подключение
+        conn = sqlite3.connect(self.db_name, timeout=30, check_same_thread=False)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
 
-class SQLiteDBHandler:
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Закрывает подключения всех потоков."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as err:
+                logger.debug(f"Ошибка при закрытии подключения к БД: {err}")
+        self._local = threading.local()
+
+
+class SQLiteDBHandler(SQLiteConnections, ViewedStore):
     """Работа с БД sqlite"""
-    _instance = None
+    name = "sqlite"
+    multiprocess_safe = True
+    MAX_PAIRS_PER_QUERY = 400  # лимит параметров sqlite в старых версиях - 999
+    CACHE_MIN_CAPACITY = 100_000
+    PAIRS_BATCH = 50_000  # выгрузка и загрузка снимков
+    VIEWED_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER NOT NULL,
+            price INTEGER NOT NULL,
+            first_seen INTEGER,
+            last_seen INTEGER,
+            PRIMARY KEY (id, price)
+        ) WITHOUT ROWID
+    """
+    UPSERT_VIEWED = """
+        INSERT INTO viewed (id, price, first_seen, last_seen) VALUES (?, ?, ?, ?)
+        ON CONFLICT (id, price) DO UPDATE SET last_seen = excluded.last_seen
+    """
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(SQLiteDBHandler, cls).__new__(cls)
-        return cls._instance
+    def __init__(
+            self,
+            db_name="database.db",
+            use_cache: bool = True,
+            cache_fp_rate: float = 0.01,
+            cache_max_mb: int = 64,
+            retention_days: int = 0,
+            retention_rows: int = 0,
+    ):
+        super().__init__(db_name=db_name)
+        self._create_table()
+        # фильтр Блума перед таблицей viewed: "нет" - точно не видели, "да" - проверяем в БД
+        self._bloom: BloomFilter | None = None
+        self._cache_params = {"fp_rate": cache_fp_rate, "max_mb": cache_max_mb}
+        self._cache_stale = False
+        if use_cache:
+            self._load_cache(**self._cache_params)
+        self._retention: ViewedRetention | None = None
+        if retention_days or retention_rows:
+            self._retention = ViewedRetention(
+                handler=self,
+                max_age_days=retention_days,
+                max_rows=retention_rows,
+            )
 
-    def __init__(self, db_name="database.db"):
-        if not hasattr(self, "_initialized"):
-            self.db_name = db_name
-            self._create_table()
-            self._initialized = True
+    def set_busy(self, busy: bool):
+        """Идёт цикл парсинга - тяжёлое обслуживание БД (сжатие) откладывается."""
+        if self._retention is not None:
+            if busy:
+                self._retention.start()
+            self._retention.set_busy(busy)
+
+    def stop_maintenance(self):
+        """Последний цикл: останавливаем фоновое обслуживание, следующий set_busy(True) запустит его снова."""
+        if self._retention is not None:
+            self._retention.stop()
 
     def _create_table(self):
-        """Создает таблицу viewed, если она не существует."""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
+        """Создает таблицы, если их нет, и обновляет старую схему viewed."""
+        conn = self._connection()
+        with conn:
+            conn.execute(self.VIEWED_SCHEMA.format(table="viewed"))
+            conn.execute(
                 """
-                CREATE TABLE IF NOT EXISTS viewed (
-                    id INTEGER,
-                    price INTEGER
+                CREATE TABLE IF NOT EXISTS watermarks (
+                    url TEXT PRIMARY KEY,
+                    sort_ts INTEGER,
+                    ad_id INTEGER
                 )
                 """
             )
-            conn.commit()
+        self._migrate_viewed()
+        self._migrate_viewed_timestamps()
+        with conn:
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS viewed_last_seen ON viewed (last_seen)"
+            )
 
-    def add_record(self, ad: Item):
-        """Добавляет новую запись в таблицу viewed."""
+    def _migrate_viewed(self):
+        """Старые БД: viewed без первичного ключа и с дублями. Переносим в новую схему."""
+        conn = self._connection()
+        columns = conn.execute("PRAGMA table_info(viewed)").fetchall()
+        if any(column[5] for column in columns):  # column[5] - позиция в первичном ключе
+            return
 
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO viewed (id, price) VALUES (?, ?)",
-                (ad.id, ad.priceDetailed.value),
+        logger.info("Обновляю схему таблицы viewed, это может занять время")
+        now = int(time.time())
+        with conn:
+            conn.execute(self.VIEWED_SCHEMA.format(table="viewed_new"))
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO viewed_new (id, price, first_seen, last_seen)
+                SELECT id, price, ?, ? FROM viewed
+                WHERE id IS NOT NULL AND price IS NOT NULL
+                """,
+                (now, now),
             )
-            conn.commit()
+            before = conn.execute("SELECT COUNT(*) FROM viewed").fetchone()[0]
+            after = conn.execute("SELECT COUNT(*) FROM viewed_new").fetchone()[0]
+            conn.execute("DROP TABLE viewed")
+            conn.execute("ALTER TABLE viewed_new RENAME TO viewed")
+        logger.info(f"Таблица viewed обновлена: было {before} записей, осталось {after}")
+
+    def _migrate_viewed_timestamps(self):
+        """БД до появления first_seen/last_seen: добавляем колонки, время - момент обновления."""
+        conn = self._connection()
+        columns = {column[1] for column in conn.execute("PRAGMA table_info(viewed)")}
+        if "last_seen" in columns:
+            return
+
+        logger.info("Добавляю в таблицу viewed время первого и последнего просмотра")
+        now = int(time.time())
+        with conn:
+            conn.execute("ALTER TABLE viewed ADD COLUMN first_seen INTEGER")
+            conn.execute("ALTER TABLE viewed ADD COLUMN last_seen INTEGER")
+            conn.execute("UPDATE viewed SET first_seen = ?, last_seen = ?", (now, now))
+
+    def _load_cache(self, fp_rate: float, max_mb: int):
+        """Загружает все (id, price) из viewed в фильтр Блума."""
+        started = time.perf_counter()
+        conn = self._connection()
+        rows = conn.execute("SELECT COUNT(*) FROM viewed").fetchone()[0]
+        # запас под новые записи, чтобы ошибка фильтра не росла до следующего запуска
+        bloom = BloomFilter(
+            capacity=max(rows * 2, self.CACHE_MIN_CAPACITY),
+            fp_rate=fp_rate,
+            max_bytes=max_mb * 1024 * 1024,
+        )
+        bloom.update(conn.execute("SELECT id, price FROM viewed"))
+        self._bloom = bloom
+        logger.info(
+            f"Кэш просмотренных: {rows} записей, {bloom.size_bytes / 1024 / 1024:.1f} МБ, "
+            f"загружен за {time.perf_counter() - started:.2f} сек."
+        )
+
+    def invalidate_cache(self):
+        """viewed менялась в обход этого объекта (другие процессы) - перечитаем при следующей проверке."""
+        if self._bloom is not None:
+            self._bloom = None
+            self._cache_stale = True
+
+    def _reload_stale_cache(self) -> None:
+        if self._cache_stale:
+            self._cache_stale = False
+            self._load_cache(**self._cache_params)
+
+    def _maybe_seen(self, pair: tuple[int, int]) -> bool:
+        self._reload_stale_cache()
+        return self._bloom is None or pair in self._bloom
+
+    def add_record(self, ad: Item):
+        """Добавляет новую запись в таблицу viewed."""
+        record = (ad.id, ad.priceDetailed.value)
+        now = int(time.time())
+        conn = self._connection()
+        with conn:
+            conn.execute(self.UPSERT_VIEWED, (*record, now, now))
+        if self._bloom is not None:
+            self._bloom.add(record)
 
     def add_record_from_page(self, ads: list[Item]):
         """Добавляет несколько записей в таблицу viewed."""
         records = [(ad.id, ad.priceDetailed.value) for ad in ads]
+        now = int(time.time())
 
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.executemany(
-                """
-                INSERT OR REPLACE INTO viewed (id, price)
-                VALUES (?, ?)
-                """,
-                records,
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                self.UPSERT_VIEWED,
+                [(*record, now, now) for record in records],
             )
-            conn.commit()
+        if self._bloom is not None:
+            self._bloom.update(records)
+
+    def iter_pairs(self) -> Iterator[tuple[int, int]]:
+        """Все (id, price) в порядке первичного ключа, отдельным подключением."""
+        conn = self._open_connection()
+        try:
+            cursor = conn.execute("SELECT id, price FROM viewed ORDER BY id, price")
+            while rows := cursor.fetchmany(self.PAIRS_BATCH):
+                yield from rows
+        finally:
+            conn.close()
+
+    def add_pairs(self, pairs: Iterable[tuple[int, int]]) -> None:
+        """Добавляет (id, price) пачками, по порядку ключа вставка идёт почти последовательно."""
+        now = int(time.time())
+        conn = self._connection()
+        batch = []
+        for pair in pairs:
+            batch.append(pair)
+            if len(batch) >= self.PAIRS_BATCH:
+                self._insert_pairs(conn, batch, now)
+                batch = []
+        if batch:
+            self._insert_pairs(conn, batch, now)
+
+    def _insert_pairs(self, conn: sqlite3.Connection, pairs: list[tuple[int, int]], now: int) -> None:
+        with conn:
+            conn.executemany(self.UPSERT_VIEWED, [(*pair, now, now) for pair in pairs])
+        if self._bloom is not None:
+            self._bloom.update(pairs)
 
     def record_exists(self, record_id, price):
         """Проверяет, существует ли запись с заданными id и price."""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT 1 FROM viewed WHERE id = ? AND price = ?",
-                (record_id, price),
+        if not self._maybe_seen((record_id, price)):
+            return False
+        cursor = self._connection().execute(
+            "SELECT 1 FROM viewed WHERE id = ? AND price = ?",
+            (record_id, price),
+        )
+        return cursor.fetchone() is not None
+
+    def filter_unseen(self, pairs: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """Возвращает пары (id, price), которых нет в таблице viewed, одним запросом на пачку."""
+        if not pairs:
+            return []
+
+        # в БД идём только за теми, про которые фильтр Блума не уверен
+        self._reload_stale_cache()
+        bloom = self._bloom
+        candidates = bloom.maybe_contains(pairs) if bloom is not None else pairs
+        if not candidates:
+            return list(pairs)
+
+        seen = set()
+        conn = self._connection()
+        for start in range(0, len(candidates), self.MAX_PAIRS_PER_QUERY):
+            chunk = candidates[start:start + self.MAX_PAIRS_PER_QUERY]
+            values = ", ".join("(?, ?)" for _ in chunk)
+            # join по VALUES идёт поиском по первичному ключу, а не сканом таблицы
+            cursor = conn.execute(
+                f"""
+                SELECT viewed.id, viewed.price
+                FROM (VALUES {values}) AS page
+                JOIN viewed ON viewed.id = page.column1 AND viewed.price = page.column2
+                """,
+                [value for pair in chunk for value in pair],
+            )
+            seen.update(cursor.fetchall())
+        if self._retention is not None:
+            self._retention.touch(seen)
+        return [pair for pair in pairs if pair not in seen]
+
+    def get_watermark(self, url: str) -> tuple[int, int] | None:
+        """Самое свежее (sortTimeStamp, id), которое видели по ссылке."""
+        row = self._connection().execute(
+            "SELECT sort_ts, ad_id FROM watermarks WHERE url = ?",
+            (url,),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set_watermark(self, url: str, sort_ts: int, ad_id: int):
+        """Запоминает самое свежее объявление по ссылке."""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO watermarks (url, sort_ts, ad_id) VALUES (?, ?, ?)",
+                (url, sort_ts, ad_id),
+            )
+
+
+class ViewedRetention:
+    """
+    Обслуживание таблицы viewed в фоновом потоке:
+    - last_seen у повторно встреченных объявлений обновляется пачкой
+    - записи старше max_age_days (по last_seen) и сверх max_rows удаляются небольшими порциями
+    - освободившееся место возвращается ОС только между циклами парсинга
+    Старая БД без incremental auto_vacuum переводится одним VACUUM при запуске, до первого цикла.
+    Для max_rows записи считаются целиком раз в RECOUNT_INTERVAL, между пересчётами добавляются только
+    новые (first_seen после прошлой проверки, поиск по индексу last_seen)
+    """
+    INTERVAL = 60  # сек. между проходами
+    BATCH = 5_000  # записей за одну транзакцию
+    MAX_BATCHES = 20  # транзакций за проход
+    VACUUM_PAGES = 2_000  # страниц за один incremental_vacuum
+    RECOUNT_INTERVAL = 24 * 60 * 60  # сек. между полными пересчётами записей
+
+    def __init__(self, handler: SQLiteDBHandler, max_age_days: int = 0, max_rows: int = 0):
+        self.handler = handler
+        self.max_age_days = max_age_days
+        self.max_rows = max_rows
+
+        self._touched: set[tuple] = set()
+        self._touched_lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._stop = threading.Event()
+        self._rows: int | None = None
+        self._rows_until = 0  # записи с first_seen раньше этого момента уже в _rows
+        self._recount_at = 0.0
+        self._upgrade_legacy()
+        self._thread: threading.Thread | None = None
+        self.start()
+
+    def _upgrade_legacy(self) -> None:
+        """VACUUM не прервать, поэтому только здесь, пока циклов парсинга ещё нет"""
+        conn = self.handler._connection()
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:  # INCREMENTAL
+            return
+        logger.info(f"Сжимаю {self.handler.db_name} и включаю постепенное сжатие, это может занять время")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+
+    def touch(self, pairs) -> None:
+        with self._touched_lock:
+            self._touched.update(pairs)
+
+    def set_busy(self, busy: bool) -> None:
+        if busy:
+            self._idle.clear()
+        else:
+            self._idle.set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="viewed-retention",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает поток, дописав last_seen; start() запустит его снова"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        conn = self.handler._open_connection()
+        try:
+            while not self._stop.wait(self.INTERVAL):
+                try:
+                    self._flush_touched(conn)
+                    evicted = self._evict(conn)
+                    if evicted:
+                        logger.info(f"Удалено {evicted} старых записей из viewed")
+                    if self._idle.is_set():
+                        self._compact(conn)
+                except sqlite3.Error as err:
+                    logger.warning(f"Ошибка обслуживания БД: {err}")
+            self._flush_touched(conn)
+        except sqlite3.Error as err:
+            logger.warning(f"Ошибка обслуживания БД: {err}")
+        finally:
+            conn.close()
+
+    def _flush_touched(self, conn: sqlite3.Connection) -> None:
+        with self._touched_lock:
+            touched, self._touched = self._touched, set()
+        if not touched:
+            return
+        now = int(time.time())
+        with conn:
+            conn.executemany(
+                "UPDATE viewed SET last_seen = ? WHERE id = ? AND price = ?",
+                [(now, record_id, price) for record_id, price in touched],
+            )
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        evicted = 0
+        if self.max_age_days:
+            border = int(time.time()) - self.max_age_days * 24 * 60 * 60
+            evicted += self._delete_batches(
+                conn,
+                "SELECT id, price FROM viewed WHERE last_seen < ? LIMIT ?",
+                (border,),
+            )
+            if self._rows is not None:
+                self._rows -= evicted
+
+        if self.max_rows:
+            excess = self._row_count(conn) - self.max_rows
+            if excess > 0:
+                deleted = self._delete_batches(
+                    conn,
+                    "SELECT id, price FROM viewed ORDER BY last_seen LIMIT ?",
+                    (),
+                    limit=excess,
+                )
+                self._rows -= deleted
+                evicted += deleted
+        return evicted
+
+    def _row_count(self, conn: sqlite3.Connection) -> int:
+        """Число записей без скана всей таблицы на каждом проходе"""
+        now = int(time.time())
+        if self._rows is None or time.monotonic() >= self._recount_at:
+            self._rows = conn.execute(
+                "SELECT COUNT(*) FROM viewed WHERE first_seen IS NULL OR first_seen < ?",
+                (now,),
+            ).fetchone()[0]
+            self._recount_at = time.monotonic() + self.RECOUNT_INTERVAL
+        else:
+            # у новой записи last_seen = first_seen, поэтому хватает диапазона по индексу last_seen;
+            # удаляет записи только этот поток, обновление существующих first_seen не меняет
+            self._rows += conn.execute(
+                "SELECT COUNT(*) FROM viewed WHERE last_seen >= ? AND first_seen >= ? AND first_seen < ?",
+                (self._rows_until, self._rows_until, now),
+            ).fetchone()[0]
+        self._rows_until = now
+        return self._rows
+
+    def _delete_batches(self, conn, select_sql: str, params: tuple, limit: int | None = None) -> int:
+        deleted = 0
+        for _ in range(self.MAX_BATCHES):
+            if self._stop.is_set():
+                break
+            batch = self.BATCH if limit is None else min(self.BATCH, limit - deleted)
+            if batch <= 0:
+                break
+            keys = conn.execute(select_sql, (*params, batch)).fetchall()
+            if not keys:
+                break
+            # короткие транзакции, чтобы парсер не ждал блокировку
+            with conn:
+                conn.executemany("DELETE FROM viewed WHERE id = ? AND price = ?", keys)
+            deleted += len(keys)
+            if len(keys) < batch:
+                break
+        return deleted
+
+    def _compact(self, conn: sqlite3.Connection) -> None:
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if not free_pages:
+            return
+
+        # старая БД, которую не удалось перевести при запуске, - полный VACUUM здесь не запускаем
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # INCREMENTAL
+            return
+        while free_pages and self._idle.is_set() and not self._stop.is_set():
+            conn.execute(f"PRAGMA incremental_vacuum({self.VACUUM_PAGES})")
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+class SQLitePriceHistory(SQLiteConnections):
+    """
+    История цен: строка на первое появление объявления и на каждое изменение цены, только добавление.
+    Снижения цены лежат в частичном индексе, поэтому выборка по ним не зависит от размера таблицы
+    """
+    MAX_IDS_PER_QUERY = 500
+
+    def __init__(self, db_name="database.db"):
+        super().__init__(db_name=db_name)
+        self._create_table()
+
+    def _create_table(self):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS price_history (
+                    ad_id INTEGER NOT NULL,
+                    price INTEGER NOT NULL,
+                    prev_price INTEGER,
+                    changed_at INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS price_history_ad
+                ON price_history (ad_id, changed_at)
+                """
             )
-            return cursor.fetchone() is not None
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS price_history_drops
+                ON price_history (changed_at, ad_id, price, prev_price)
+                WHERE price < prev_price
+                """
+            )
+
+    def last_prices(self, ad_ids: list[int]) -> dict[int, int]:
+        """Последняя известная цена по каждому id."""
+        conn = self._connection()
+        prices = {}
+        for start in range(0, len(ad_ids), self.MAX_IDS_PER_QUERY):
+            chunk = ad_ids[start:start + self.MAX_IDS_PER_QUERY]
+            # при MAX() sqlite берёт price из той же строки, rowid растёт с каждой записью
+            cursor = conn.execute(
+                f"""
+                SELECT ad_id, price, MAX(rowid) FROM price_history
+                WHERE ad_id IN ({", ".join("?" for _ in chunk)})
+                GROUP BY ad_id
+                """,
+                chunk,
+            )
+            prices.update((ad_id, price) for ad_id, price, _ in cursor)
+        return prices
+
+    def record_page(self, ads: list[Item]) -> int:
+        """Записывает цены со страницы одной транзакцией, возвращает число новых строк."""
+        current = {
+            ad.id: ad.priceDetailed.value
+            for ad in ads
+            if ad.priceDetailed is not None and ad.priceDetailed.value is not None
+        }
+        if not current:
+            return 0
+
+        known = self.last_prices(ad_ids=list(current))
+        now = int(time.time())
+        rows = [
+            (ad_id, price, known.get(ad_id), now)
+            for ad_id, price in current.items()
+            if known.get(ad_id) != price
+        ]
+        if rows:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO price_history (ad_id, price, prev_price, changed_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+        return len(rows)
+
+    def drops(
+            self,
+            percent: float,
+            hours: float = 24,
+            since: int | None = None,
+            limit: int = 100,
+    ) -> list[PriceDrop]:
+        """Снижения цены больше чем на percent % за последние hours часов (или начиная с since)."""
+        if since is None:
+            since = int(time.time() - hours * 60 * 60)
+        cursor = self._connection().execute(
+            """
+            SELECT ad_id, prev_price, price, changed_at FROM price_history
+            WHERE changed_at >= ? AND price < prev_price AND price * 100 <= prev_price * (100 - ?)
+            ORDER BY changed_at DESC
+            LIMIT ?
+            """,
+            (since, percent, limit),
+        )
+        return [PriceDrop(*row) for row in cursor]
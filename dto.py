@@ -17,11 +17,35 @@ class ProxySplit:
     change_ip_link: str
 
 
+@dataclass
+class SellerInfo:
+    seller_id: str
+    seller_type: str  # shop | private
+    shop_slug: Optional[str] = None
+
+
+@dataclass
+class PriceDrop:
+    ad_id: int
+    old_price: int
+    new_price: int
+    changed_at: int  # unix time, сек.
+
+    @property
+    def percent(self) -> float:
+        return (self.old_price - self.new_price) * 100 / self.old_price
+
+
 @dataclass
 class AvitoConfig:
     urls: List[str]
     proxy_string: Optional[str] = None
     proxy_change_url: Optional[str] = None
+    proxy_pool: List[str] = field(default_factory=list)
+    proxy_cooldown: int = 120
+    proxy_probe_url: str = "https://api.ipify.org"
+    proxy_rotate_interval: int = 30
+    proxy_rotate_timeout: int = 60
     keys_word_white_list: List[str] = field(default_factory=list)
     keys_word_black_list: List[str] = field(default_factory=list)
     seller_black_list: List[str] = field(default_factory=list)
@@ -48,12 +72,45 @@ class AvitoConfig:
     use_bypass_api: bool = False
     cookies_api_key: str = None
     purchase_cooldown: int = 600
+    cookies_pool_size: int = 0
+    cookies_pool_budget: int = 10
+    cookies_price: float = 0
     output_dir: Path = Path("result")
     use_own_cookies: bool = False
     parse_phone: bool = False
     proxy_notifier: str = None
     tg_only_text: bool = False
     retry_delay: int = 5
+    retry_delay_max: int = 60
+    retry_backoff: str = "decorrelated"
+    pacer: bool = False
+    pacer_min_rate: float = 0.2
+    pacer_max_rate: float = 5.0
+    pacer_start_rate: float = 1.0
+    pacer_increase: float = 0.05
+    pacer_decrease: float = 0.5
+    breaker_failures: int = 5
+    breaker_reset: int = 60
+    trace_sample_rate: float = 0
     timeout: int = 20
     block_threshold: int = 3
+    crawl_mode: str = "sync"
+    max_concurrency: int = 4
+    max_concurrency_per_proxy: int = 2
+    page_concurrency: int = 1
+    pipeline_queue_size: int = 4
+    workers: int = 1
+    use_watermark: bool = False
+    fast_decoding: bool = True
+    viewed_backend: str = "sqlite"
+    viewed_db_path: str = ""
+    viewed_peer_snapshots: List[str] = field(default_factory=list)
+    viewed_cache: bool = False
+    viewed_cache_fp_rate: float = 0.01
+    viewed_cache_max_mb: int = 64
+    viewed_max_age_days: int = 0
+    viewed_max_rows: int = 0
+    price_history: bool = False
+    price_drop_percent: int = 0
+    write_queue_size: int = 64
 
@@ -1,15 +1,20 @@
+from datetime import datetime, timedelta, timezone
 from typing import List
 
 from loguru import logger
 
 from dto import AvitoConfig
 from models import Item
+from parser.claims import viewed_key
+from parser.viewed.base import ViewedStore
 
 
 class AdsFilter:
-    def __init__(self, config: AvitoConfig, is_viewed_fn=None):
+    def __init__(self, config: AvitoConfig, is_viewed_fn=None, viewed_store: ViewedStore | None = None):
         self.config = config
         self.is_viewed_fn = is_viewed_fn
+        # проверяет всю страницу разом, приоритетнее is_viewed_fn
+        self.viewed_store = viewed_store
 
     def apply(self, ads: List[Item]) -> List[Item]:
         """Применяет все фильтры по порядку"""
@@ -33,6 +38,9 @@ class AdsFilter:
         return ads
 
     def _filter_viewed(self, ads: List[Item]) -> List[Item]:
+        if self.viewed_store is not None:
+            unseen = set(self.viewed_store.filter_unseen(pairs=[viewed_key(ad) for ad in ads]))
+            return [ad for ad in ads if viewed_key(ad) in unseen]
         if self.is_viewed_fn:
             return [ad for ad in ads if not self.is_viewed_fn(ad)]
         return ads
@@ -68,29 +76,18 @@ class AdsFilter:
     def _filter_by_recent_time(self, ads: List[Item]) -> List[Item]:
         if not self.config.max_age:
             return ads
-        from datetime import datetime, timedelta
-        now = datetime.utcnow()
-        filtered = []
-        for ad in ads:
-            published = datetime.utcfromtimestamp(ad.sortTimeStamp / 1000)
-            if (now - published) <= timedelta(seconds=self.config.max_age):
-                filtered.append(ad)
-        return filtered
+        now = datetime.now(timezone.utc)
+        max_age = timedelta(seconds=self.config.max_age)
+        return [ad for ad in ads if ad.publishedAt and (now - ad.publishedAt) <= max_age]
 
     def _filter_by_reserve(self, ads: List[Item]) -> List[Item]:
         if not self.config.ignore_reserv:
             return ads
-        return [ad for ad in ads if not getattr(ad, "isReserved", False)]
+        return [ad for ad in ads if not ad.isReserved]
 
     def _filter_by_promotion(self, ads: List[Item]) -> List[Item]:
         if not self.config.ignore_promotion:
             return ads
-        for ad in ads:
-            ad.isPromotion = any(
-                v.get("title") == "Продвинуто"
-                for step in (ad.iva or {}).get("DateInfoStep", [])
-                for v in step.payload.get("vas", [])
-            )
         return [ad for ad in ads if not ad.isPromotion]
 
     @staticmethod
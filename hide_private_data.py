@@ -36,6 +36,13 @@ def mask_sensitive_data(config_str: str) -> str:
         masked,
     )
 
+    # ссылки смены IP в proxy_pool ("прокси|ссылка")
+    masked = re.sub(
+        r"\|(https?://[^\"'\s,\]]+)",
+        lambda m: f"|{_mask_url(m.group(1))}",
+        masked,
+    )
+
     # Общая маскировка чувствительных ключей (password, token, api_key, secret)
     masked = re.sub(
         r"((?:password|token|api_key|secret)[\"']?\s*[:=]\s*[\"'])([^\"']+)([\"'])",
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 
-from integrations.notifications.utils import escape_markdown_v2, get_price
+from dto import PriceDrop
+from integrations.notifications.utils import escape_markdown_v2, get_price, price_drop_lines
 from models import Item
 
 
@@ -16,6 +17,13 @@ class Notifier(ABC):
         for ad in ads:
             self.notify(ad=ad)
 
+    def notify_price_drops(self, drops: list[PriceDrop], percent: float):
+        """Одно сообщение со всеми снижениями цены за цикл"""
+        self.notify(message=self.format_price_drops(drops=drops, percent=percent))
+
+    def format_price_drops(self, drops: list[PriceDrop], percent: float) -> str:
+        return "\n".join(escape_markdown_v2(line) for line in price_drop_lines(drops, percent))
+
     # default форматирование
     def format(self, ad: Item) -> str:
         price = escape_markdown_v2(get_price(ad))
@@ -1,5 +1,6 @@
 from loguru import logger
 
+from dto import PriceDrop
 from models import Item
 from .base import Notifier
 
@@ -17,6 +18,16 @@ class CompositeNotifier(Notifier):
                     f"Ошибка {e} отправки уведомления через {notifier.__class__.__name__}"
                 )
 
+    def notify_price_drops(self, drops: list[PriceDrop], percent: float):
+        # у каждого канала своё форматирование
+        for notifier in self.notifiers:
+            try:
+                notifier.notify_price_drops(drops=drops, percent=percent)
+            except Exception as e:
+                logger.exception(
+                    f"Ошибка {e} отправки уведомления через {notifier.__class__.__name__}"
+                )
+
 
 class NullNotifier(Notifier):
     def notify(self, ad: Item = None, message: str = None):
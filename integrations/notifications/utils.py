@@ -1,4 +1,6 @@
 import re
+
+from dto import PriceDrop
 from models import Item
 
 
@@ -25,14 +27,19 @@ def get_price(ad: Item) -> str:
 
 
 def get_first_image(ad: Item) -> str | None:
-    if not getattr(ad, "images", None):
+    images = getattr(ad, "largestImageUrls", None)
+    if not images:
         return None
+    return images[0] or None
 
-    def largest(img):
-        return max(
-            img.root.keys(),
-            key=lambda k: int(k.split("x")[0]) * int(k.split("x")[1])
-        )
 
-    img = ad.images[0]
-    return str(img.root[largest(img)])
+def price_drop_lines(drops: list[PriceDrop], percent: float, limit: int = 30) -> list[str]:
+    """Простой текст уведомления о снижении цен, по строке на объявление"""
+    lines = [f"📉 Цена снизилась больше чем на {percent}%:"]
+    for drop in drops[:limit]:
+        lines.append(
+            f"{drop.old_price} → {drop.new_price} (-{drop.percent:.0f}%) https://avito.ru/{drop.ad_id}"
+        )
+    if len(drops) > limit:
+        lines.append(f"и ещё {len(drops) - limit}")
+    return lines
@@ -3,7 +3,8 @@ from loguru import logger
 
 from integrations.notifications.base import Notifier
 from integrations.notifications.transport import send_with_retries
-from integrations.notifications.utils import get_first_image
+from integrations.notifications.utils import get_first_image, price_drop_lines
+from dto import PriceDrop
 from models import Item
 
 
@@ -135,6 +136,9 @@ class VKNotifier(Notifier):
             logger.warning(f"Error uploading photo to VK: {e}")
             return None
 
+    def format_price_drops(self, drops: list[PriceDrop], percent: float) -> str:
+        return "\n".join(price_drop_lines(drops, percent))
+
     @staticmethod
     def format_ad(ad: Item) -> str:
         """Форматирует объявление в простой текст для VK (без Markdown)"""
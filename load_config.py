@@ -13,5 +13,11 @@ def load_avito_config(path: str = "config.toml") -> AvitoConfig:
 
 
 def save_avito_config(config: dict):
-    with Path("config.toml").open("wb") as f:
+    path = Path("config.toml")
+    # расширенные настройки, которых нет в gui, оставляем как были
+    if path.exists():
+        with path.open("rb") as f:
+            saved = tomllib.load(f).get("avito", {})
+        config = {**config, "avito": {**saved, **config.get("avito", {})}}
+    with path.open("wb") as f:
         tomli_w.dump(config, f)
@@ -1,4 +1,8 @@
-from pydantic import BaseModel, HttpUrl, RootModel
+from datetime import datetime
+from functools import lru_cache
+
+from loguru import logger
+from pydantic import BaseModel, ConfigDict, HttpUrl, PrivateAttr, RootModel, TypeAdapter, ValidationError
 from typing import List, Optional, Dict, Any
 
 
@@ -144,7 +148,11 @@ class Item(BaseModel):
     closestAddressId: int | None = None
     isSparePartsCompatibility: bool | None = None
     sellerId: str | None = None
+    sellerType: str | None = None
+    shopSlug: str | None = None
     isPromotion: bool = False
+    largestImageUrls: List[str] | None = None
+    publishedAt: datetime | None = None
     total_views: int | None = None
     today_views: int | None = None
     phone: str | None = None
@@ -152,3 +160,72 @@ class Item(BaseModel):
 
 class ItemsResponse(BaseModel):
     items: List[Item]
+
+
+@lru_cache(maxsize=None)
+def _item_field_adapter(name: str) -> TypeAdapter:
+    return TypeAdapter(Item.model_fields[name].annotation)
+
+
+class LazyItem(BaseModel):
+    """
+    Быстрый вариант Item.
+    Сразу валидируются только поля, которые читают фильтры, уведомления и сохранение,
+    остальные поля Item хранятся как пришли и декодируются при первом обращении.
+    Ссылки images не проверяются как HttpUrl (это большая часть времени валидации Item),
+    нужна из них только самая большая - largestImageUrls
+    """
+    model_config = ConfigDict(extra="allow")
+
+    id: int | dict | None = None
+    urlPath: str | None = None
+    title: str | None = None
+    description: str | None = None
+    location: Location | None = None
+    sortTimeStamp: int | None = None
+    priceDetailed: PriceDetailed | None = None
+    images: List[Dict[str, str]] | None = None
+    iva: Dict[str, List[IvaStep]] | None = None
+    sellerId: str | None = None
+    sellerType: str | None = None
+    shopSlug: str | None = None
+    isPromotion: bool = False
+    largestImageUrls: List[str] | None = None
+    publishedAt: datetime | None = None
+    total_views: int | None = None
+    today_views: int | None = None
+    phone: str | None = None
+
+    _decoded: set = PrivateAttr(default_factory=set)
+
+    def __getattr__(self, name: str) -> Any:
+        field = Item.model_fields.get(name)
+        if field is None:
+            return super().__getattr__(name)
+
+        extra = self.__pydantic_extra__ or {}
+        if name not in extra:
+            return field.get_default(call_default_factory=True)
+
+        if name not in self._decoded:
+            try:
+                extra[name] = _item_field_adapter(name).validate_python(extra[name])
+            except ValidationError as err:
+                logger.debug(f"Поле {name} объявления {self.id} не прошло валидацию: {err}")
+                extra[name] = None
+            self._decoded.add(name)
+        return extra[name]
+
+
+class LazyItemsResponse(BaseModel):
+    items: List[LazyItem]
+
+
+_ITEMS_ADAPTER = TypeAdapter(List[Item])
+_LAZY_ITEMS_ADAPTER = TypeAdapter(List[LazyItem])
+
+
+def decode_items(catalog: dict, lazy: bool = False) -> list[Item]:
+    """Валидирует объявления каталога одним вызовом по списку items, lazy=True - через LazyItem"""
+    adapter = _LAZY_ITEMS_ADAPTER if lazy else _ITEMS_ADAPTER
+    return adapter.validate_python(catalog.get("items"))
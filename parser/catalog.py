@@ -0,0 +1,64 @@
+"""
+Разбор ответа API каталога: байты ответа -> json (orjson, если установлен) -> dict каталога с items.
+Где в ответе лежит каталог, определяется по первой странице и запоминается для каждого API URL
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # без orjson - стандартный json, медленнее
+    orjson = None
+
+# варианты расположения каталога в ответе, по порядку проверки
+CATALOG_PATHS: tuple[tuple[str, ...], ...] = (
+    ("catalog",),
+    ("result", "catalog"),
+    ("result",),
+    (),
+)
+
+
+def loads(raw: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _follow(payload: Any, path: tuple[str, ...]) -> dict | None:
+    node = payload
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    if isinstance(node, dict) and isinstance(node.get("items"), list):
+        return node
+    return None
+
+
+def find_catalog(payload: Any) -> tuple[tuple[str, ...], dict] | None:
+    """Путь к каталогу и сам каталог, None - каталога в ответе нет"""
+    for path in CATALOG_PATHS:
+        catalog = _follow(payload, path)
+        if catalog is not None:
+            return path, catalog
+    return None
+
+
+class CatalogLocator:
+    def __init__(self):
+        self._paths: dict[str, tuple[str, ...]] = {}
+
+    def locate(self, api_url: str, payload: Any) -> dict | None:
+        path = self._paths.get(api_url)
+        if path is not None:
+            catalog = _follow(payload, path)
+            if catalog is not None:
+                return catalog
+
+        # первая страница ссылки или API поменяло формат ответа
+        found = find_catalog(payload)
+        if found is None:
+            return None
+        self._paths[api_url], catalog = found
+        return catalog
@@ -0,0 +1,43 @@
+"""
+Объявления, взятые в работу в текущем цикле, но ещё не записанные в БД просмотренных
+"""
+import threading
+
+from models import Item
+
+
+def viewed_key(ad: Item) -> tuple:
+    return ad.id, ad.priceDetailed.value
+
+
+class ViewedClaims:
+    """Защищает от повторного уведомления, если страницы обрабатываются параллельно"""
+
+    def __init__(self):
+        self._keys: set[tuple] = set()
+        self._lock = threading.Lock()
+
+    def claim(self, ads: list[Item]) -> list[Item]:
+        """Возвращает только объявления, которые ещё никто не взял в работу"""
+        with self._lock:
+            fresh = []
+            for ad in ads:
+                key = viewed_key(ad)
+                if key not in self._keys:
+                    self._keys.add(key)
+                    fresh.append(ad)
+            return fresh
+
+
+class SharedViewedClaims(ViewedClaims):
+    """То же самое, но общее для нескольких процессов (multiprocessing.Manager)"""
+
+    def __init__(self, keys, lock):
+        self._keys = keys  # manager.dict()
+        self._lock = lock  # manager.Lock()
+
+    def claim(self, ads: list[Item]) -> list[Item]:
+        with self._lock:
+            fresh = [ad for ad in ads if viewed_key(ad) not in self._keys]
+            self._keys.update({viewed_key(ad): True for ad in fresh})
+            return fresh
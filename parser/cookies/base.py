@@ -25,6 +25,24 @@ class CookiesProvider(ABC):
         """Return the HTTP client profile associated with the current cookies."""
         return None
 
+    def summary(self) -> list[str]:
+        """Строки для лога в конце цикла"""
+        return []
+
+    def start_cycle(self) -> None:
+        """
+        Этот процесс начинает обход ссылок (фоновая подготовка cookies).
+        По умолчанию — ничего не делать.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Процесс больше не будет делать запросов: остановить фоновую работу.
+        По умолчанию — ничего не делать.
+        """
+        pass
+
     @abstractmethod
     def handle_block(self):
         """
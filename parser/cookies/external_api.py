@@ -6,6 +6,8 @@ import requests
 from loguru import logger
 
 from parser.cookies.base import CookiesProvider
+from parser.cookies.warm_pool import WarmCookiePool, get_warm_pool
+from parser.http.breaker import SPFA_COOKIES, CircuitOpenError, build_breakers
 
 API_URL = "https://spfa.pro/api"
 
@@ -24,6 +26,9 @@ class ExternalApiCookiesProvider(CookiesProvider):
         self.purchase_cooldown = config.purchase_cooldown
         self.storage_path = Path(storage_path)
         self.proxy_handler = proxy
+        self.breaker = build_breakers(config).get(SPFA_COOKIES)
+        self.price = config.cookies_price
+        self.purchases = 0  # покупок за цикл при блокировке, фоновые считает запас
 
         self.last_id: str | None = None
         self.last_cookies: dict | None = None
@@ -44,6 +49,15 @@ class ExternalApiCookiesProvider(CookiesProvider):
 
         self._load_from_disk()
 
+        # запас готовых cookies: при блокировке сразу берём следующий набор
+        self.warm_pool: WarmCookiePool | None = None
+        if config.cookies_pool_size > 0:
+            self.warm_pool = get_warm_pool(
+                self.storage_path.with_name(f"{self.storage_path.stem}_pool.json"),
+                size=config.cookies_pool_size,
+                budget=config.cookies_pool_budget,
+            )
+
         self.headers = {
             "User-Agent": (
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -54,6 +68,15 @@ class ExternalApiCookiesProvider(CookiesProvider):
             "Content-Type": "application/json",
         }
 
+    def start_cycle(self) -> None:
+        # пополняет запас только процесс, который делает запросы: при workers > 1 это воркеры
+        if self.warm_pool is not None:
+            self.warm_pool.start_cycle(lambda: self._purchase(background=True))
+
+    def close(self) -> None:
+        if self.warm_pool is not None:
+            self.warm_pool.stop()
+
     def get(self) -> dict:
         if self.last_cookies:
             return self.last_cookies
@@ -108,6 +131,10 @@ class ExternalApiCookiesProvider(CookiesProvider):
 
         now = time.time()
 
+        # ---- Есть готовые cookies в запасе ----
+        if self._take_warm():
+            return
+
         # ---- Нет cookies вообще ----
         if not self.last_id:
             logger.warning("⚠️ Нет cookies id — запрашиваем новые cookies")
@@ -150,7 +177,7 @@ class ExternalApiCookiesProvider(CookiesProvider):
         logger.info(f"🔓 Пытаемся разблокировать cookies | id={self.last_id}")
 
         try:
-            res = requests.post(
+            res = self._post(
                 f"{API_URL}/unblock/",
                 json={
                     "id": self.last_id,
@@ -160,6 +187,9 @@ class ExternalApiCookiesProvider(CookiesProvider):
                 headers=self.headers,
                 timeout=30,
             )
+        except CircuitOpenError as e:
+            logger.warning(f"🚧 Разблокировку пропускаем: {e}")
+            return
         except requests.RequestException as e:
             logger.error(
                 f"❌ Ошибка при запросе к API разблокировки | id={self.last_id} | {e}"
@@ -209,10 +239,53 @@ class ExternalApiCookiesProvider(CookiesProvider):
         self._get_new_cookies()
 
     def _get_new_cookies(self) -> dict:
+        if self._take_warm():
+            return self.last_cookies
+
+        self._apply(self._purchase())
+        self.purchases += 1
+        logger.info(f"✅ Cookies успешно получены | id={self.last_id}")
+        time.sleep(self.WAIT_FOR_NEW)
+        return self.last_cookies
+
+    def _take_warm(self) -> bool:
+        """Заменить текущие cookies набором из запаса, False - запас пуст или выключен"""
+        if self.warm_pool is None:
+            return False
+        cookie_set = self.warm_pool.take()
+        if cookie_set is None:
+            return False
+        logger.info(
+            f"🔁 Берём готовые cookies из запаса | id={cookie_set['id']} вместо id={self.last_id} "
+            f"| осталось {len(self.warm_pool)}"
+        )
+        self._apply(cookie_set)
+        return True
+
+    def _apply(self, cookie_set: dict) -> None:
+        self.last_id = cookie_set["id"]
+        self.last_cookies = cookie_set["cookies"]
+        self.fingerprint = cookie_set["fingerprint"]
+        self.mobile = cookie_set["mobile"]
+        self.user_agent = cookie_set["user_agent"]
+
+        # набор из запаса мог быть куплен давно - считаем от его покупки, а не от момента, когда его взяли
+        self.last_purchase_at = cookie_set.get("purchased_at") or time.time()
+        self.status_history.clear()  # сбрасываем историю последних кодов после покупки
+        self.unblock_started_at = None
+
+        self._save_to_disk()
+
+    def _purchase(self, background: bool = False) -> dict:
+        """
+        Покупка набора cookies. background - пополнение запаса: при ошибке IP не меняем и не ждём,
+        паузу держит сам запас
+        """
+        on_failure = (lambda pause=None: None) if background else self._handle_purchase_failure
         logger.info("🛒 Запрашиваем покупку новых cookies у сервиса")
 
         try:
-            res = requests.post(
+            res = self._post(
                 f"{API_URL}/cookies/mobile/",
                 json={
                     "api_key": self.api_key,
@@ -224,82 +297,103 @@ class ExternalApiCookiesProvider(CookiesProvider):
             )
         except requests.RequestException as e:
             logger.error(f"❌ Не удалось связаться с сервисом cookies | ошибка={e}")
-            self._handle_purchase_failure()
+            on_failure()
             raise
 
         # ---- Обработка HTTP ошибок ----
         if res.status_code == 401:
             logger.error("⛔ Не передан API key при запросе cookies")
-            self._handle_purchase_failure(self.PAUSE_FOR_ERROR)
+            on_failure(self.PAUSE_FOR_ERROR)
             res.raise_for_status()
 
         if res.status_code == 403:
             logger.error("⛔ Доступ запрещён: неверный API key или недостаточно средств")
-            self._handle_purchase_failure(self.NOT_BALANCE)
+            on_failure(self.NOT_BALANCE)
             res.raise_for_status()
 
         if res.status_code == 503:
             logger.warning("🚧 Сервис cookies временно недоступен (парсер не готов)")
-            self._handle_purchase_failure(self.PAUSE_FOR_ERROR)
+            on_failure(self.PAUSE_FOR_ERROR)
             res.raise_for_status()
 
         if not res.ok:
             logger.error(f"❌ Ошибка при покупке cookies | статус={res.status_code} | тело={res.text}")
-            self._handle_purchase_failure(self.PAUSE_FOR_ERROR)
+            on_failure(self.PAUSE_FOR_ERROR)
             res.raise_for_status()
 
         # ---- Успешный ответ ----
         try:
             payload = res.json()
             if not payload.get("success"):
-                self._handle_purchase_failure()
+                on_failure()
                 raise RuntimeError("Сервис cookies вернул success=false")
             data = payload.get("results", {})
         except ValueError:
             logger.error("❌ Сервер вернул некорректный JSON при покупке cookies")
-            self._handle_purchase_failure()
+            on_failure()
             raise
 
-        self.last_id = data.get("id")
-        self.last_cookies = data.get("cookies")
-        self.fingerprint = data.get("fingerprint")
-        self.mobile = data.get("mobile")
-
+        cookies = data.get("cookies")
+        fingerprint = data.get("fingerprint")
         fingerprint_headers = (
-            self.fingerprint.get("headers", {})
-            if isinstance(self.fingerprint, dict)
+            fingerprint.get("headers", {})
+            if isinstance(fingerprint, dict)
             else {}
         )
-        self.user_agent = data.get("user_agent") or fingerprint_headers.get("user-agent")
+        user_agent = data.get("user_agent") or fingerprint_headers.get("user-agent")
 
         if (
-            not self.last_id
-            or not isinstance(self.last_cookies, dict)
-            or not self.last_cookies
-            or not self.user_agent
-            or not isinstance(self.fingerprint, dict)
-            or not self.fingerprint.get("impersonate")
+            not data.get("id")
+            or not isinstance(cookies, dict)
+            or not cookies
+            or not user_agent
+            or not isinstance(fingerprint, dict)
+            or not fingerprint.get("impersonate")
             or not isinstance(fingerprint_headers, dict)
             or not fingerprint_headers
         ):
             logger.error(f"❌ Ответ сервера без cookies | данные={data}")
-            self._handle_purchase_failure()
+            on_failure()
             raise RuntimeError("Сервер вернул неполные данные cookies")
 
-        self.last_purchase_at = time.time()  # новое: сохраняем дату и время покупки
-        self.status_history.clear()  # сбрасываем историю последних кодов после покупки
-
-        logger.info(f"✅ Cookies успешно получены | id={self.last_id}")
+        return {
+            "id": data["id"],
+            "cookies": cookies,
+            "fingerprint": fingerprint,
+            "mobile": data.get("mobile"),
+            "user_agent": user_agent,
+            "purchased_at": time.time(),
+        }
 
-        self._save_to_disk()
-        logger.debug("💾 Cookies сохранены на диск")
-        time.sleep(self.WAIT_FOR_NEW)
-        return self.last_cookies
+    def summary(self) -> list[str]:
+        purchases = self.purchases + (self.warm_pool.cycle_purchases if self.warm_pool is not None else 0)
+        line = f"куплено за цикл: {purchases}"
+        if self.price:
+            line += f", на {purchases * self.price:.2f}"
+        if self.warm_pool is not None:
+            line += f", в запасе {len(self.warm_pool)} из {self.warm_pool.size}"
+        return [line]
+
+    def _post(self, url: str, **kwargs) -> requests.Response:
+        """Запрос к spfa через предохранитель: пока сервис недоступен, сразу CircuitOpenError"""
+        if self.breaker is None:
+            return requests.post(url, **kwargs)
+
+        self.breaker.allow()
+        try:
+            res = requests.post(url, **kwargs)
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_status(res.status_code)
+        return res
 
     def _handle_purchase_failure(self, pause: int | None = None) -> None:
         if self.proxy_handler is not None:
             try:
                 self.proxy_handler.handle_block()
+                # следующая покупка - уже с новым IP
+                self.proxy_handler.wait_ready()
             except Exception as err:
                 logger.warning(
                     f"Не удалось сменить IP после ошибки получения cookies: {err}"
@@ -2,8 +2,15 @@ from parser.cookies.base import CookiesProvider
 from parser.cookies.external_api import ExternalApiCookiesProvider
 from parser.cookies.own_cookies import OwnCookiesProvider
 
-def build_cookies_provider(config, proxy=None) -> CookiesProvider | None:
+def build_cookies_provider(config, proxy=None, worker_id: int | None = None) -> CookiesProvider | None:
     if config.use_bypass_api:
+        if worker_id is not None:
+            # у каждого процесса свои cookies
+            return ExternalApiCookiesProvider(
+                config,
+                storage_path=f"storage/cookies_external_{worker_id}.json",
+                proxy=proxy,
+            )
         return ExternalApiCookiesProvider(config, proxy=proxy)
     elif config.use_own_cookies:
         return OwnCookiesProvider()
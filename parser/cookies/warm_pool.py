@@ -0,0 +1,128 @@
+"""
+Запас готовых cookies spfa (cookies + fingerprint): при блокировке провайдер сразу берёт следующий набор,
+а не ждёт разблокировку или покупку. Запас пополняется в фоне, не больше budget покупок за цикл,
+и хранится на диске, поэтому переживает перезапуск. Один запас на процесс и файл: циклы парсера
+создают новый провайдер, а запас и поток пополнения остаются. Поток запускается только в процессе,
+который сам делает запросы, и останавливается (с ожиданием начатой покупки) перед выходом из него
+"""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+
+
+class WarmCookiePool:
+    REFILL_PAUSE = 120  # пауза после неудачной покупки, сек.
+    MAX_AGE = 24 * 60 * 60  # старые наборы выбрасываем, сек.
+
+    def __init__(self, path: str | Path, size: int, budget: int = 0):
+        self.path = Path(path)
+        self.size = size
+        self.budget = budget
+        self.purchase: Callable[[], dict] | None = None
+        self.cycle_purchases = 0  # удачных фоновых покупок за цикл
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._sets: list[dict] = self._load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sets)
+
+    def start_cycle(self, purchase: Callable[[], dict]) -> None:
+        """purchase - покупка одного набора, вызывается из фонового потока"""
+        self.purchase = purchase
+        self.cycle_purchases = 0
+        if self._thread is None or not self._thread.is_alive():
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="cookies-refill", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def stop(self) -> None:
+        """Останавливает пополнение, дожидаясь начатой покупки: купленный набор не теряется"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self.purchase = None
+
+    def take(self) -> dict | None:
+        """Самый старый из свежих наборов, None - запас пуст"""
+        with self._lock:
+            self._drop_expired()
+            cookie_set = self._sets.pop(0) if self._sets else None
+            self._save()
+        self._wake.set()
+        return cookie_set
+
+    def _needs_refill(self) -> bool:
+        if self._stop.is_set() or self.purchase is None:
+            return False
+        if self.budget and self.cycle_purchases >= self.budget:
+            return False
+        with self._lock:
+            self._drop_expired()
+            return len(self._sets) < self.size
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(timeout=60)
+            self._wake.clear()
+            while self._needs_refill():
+                try:
+                    cookie_set = self.purchase()
+                except Exception as err:
+                    logger.warning(f"Не удалось пополнить запас cookies: {err}")
+                    self._stop.wait(self.REFILL_PAUSE)
+                    break
+                self.cycle_purchases += 1
+                with self._lock:
+                    self._sets.append(cookie_set)
+                    self._save()
+                logger.info(f"В запасе cookies: {len(self)} из {self.size}")
+
+    def _drop_expired(self) -> None:
+        now = time.time()
+        self._sets = [item for item in self._sets if now - item.get("purchased_at", 0) < self.MAX_AGE]
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            temp_path.write_text(json.dumps(self._sets, ensure_ascii=False, indent=2), encoding="utf-8")
+            temp_path.replace(self.path)
+        except Exception as err:
+            logger.warning(f"Не удалось сохранить запас cookies: {err}")
+
+    def _load(self) -> list[dict]:
+        if not self.path.exists():
+            return []
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return [item for item in data if isinstance(item, dict) and item.get("cookies")]
+        except Exception as err:
+            logger.warning(f"Не удалось загрузить запас cookies: {err}")
+            return []
+
+
+_pools: dict[Path, WarmCookiePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_warm_pool(path: str | Path, size: int, budget: int = 0) -> WarmCookiePool:
+    key = Path(path).resolve()
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = WarmCookiePool(path=path, size=size, budget=budget)
+        pool.size, pool.budget = size, budget
+        return pool
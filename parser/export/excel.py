@@ -1,9 +1,7 @@
 from pathlib import Path
 from threading import Lock
-from datetime import datetime
 
 from openpyxl import Workbook, load_workbook
-from loguru import logger
 from tzlocal import get_localzone
 
 from parser.export.base import ResultStorage
@@ -53,11 +51,9 @@ class ExcelStorage(ResultStorage):
 
     @staticmethod
     def _get_ad_time(ad: Item):
-        return (
-            datetime
-            .fromtimestamp(ad.sortTimeStamp / 1000, tz=get_localzone())
-            .replace(tzinfo=None)
-        )
+        if not ad.publishedAt:
+            return ""
+        return ad.publishedAt.astimezone(get_localzone()).replace(tzinfo=None)
 
     @staticmethod
     def _get_item_coords(ad: Item) -> str:
@@ -71,18 +67,6 @@ class ExcelStorage(ResultStorage):
             return ad.coords["address_user"]
         return ""
 
-    @staticmethod
-    def _get_largest_image_url(img) -> str:
-        try:
-            best_key = max(
-                img.root.keys(),
-                key=lambda k: int(k.split("x")[0]) * int(k.split("x")[1])
-            )
-            return str(img.root[best_key])
-        except Exception as err:
-            logger.error(f"При определении лучшего изображения ошибка: {err}")
-            return ""
-
     @staticmethod
     def excel_safe(value):
         # Formula Injection fix
@@ -99,10 +83,7 @@ class ExcelStorage(ResultStorage):
             sheet = workbook.active
 
             for ad in ads:
-                images_urls = [
-                    self._get_largest_image_url(img)
-                    for img in ad.images
-                ]
+                images_urls = ad.largestImageUrls or []
 
                 row = [
                     self.excel_safe(ad.title),
@@ -0,0 +1,20 @@
+from parser.export.base import ResultStorage
+from models import Item
+
+
+class MemoryResultStorage(ResultStorage):
+    """
+    Копит результаты в памяти.
+    Нужен воркерам, которые отдают объявления в основной процесс
+    """
+    name = "memory"
+
+    def __init__(self):
+        self.ads: list[Item] = []
+
+    def save(self, ads: list[Item]) -> None:
+        self.ads.extend(ads)
+
+    def pop(self) -> list[Item]:
+        ads, self.ads = self.ads, []
+        return ads
@@ -0,0 +1,199 @@
+"""
+Асинхронный клиент для запросов парсера (curl_cffi AsyncSession)
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from curl_cffi import requests
+from loguru import logger
+
+from parser.cookies.base import CookiesProvider
+from parser.http.backoff import BackoffPolicy
+from parser.http.breaker import CircuitBreaker
+from parser.http.client import HttpClient, BLOCK_STATUS_CODES
+from parser.http.pacer import AimdPacer
+from parser.http.tracing import RequestHook
+from parser.proxies.proxy import Proxy
+
+
+class AsyncHttpClient(HttpClient):
+    """
+    Тот же HttpClient, но для asyncio.
+    Ограничивает число одновременных запросов глобально и на каждый прокси.
+    """
+
+    def __init__(
+        self,
+        proxy: Proxy,
+        cookies: CookiesProvider | None = None,
+        timeout: int = 30,
+        max_retries: int = 5,
+        retry_delay: int = 5,
+        block_threshold: int = 3,
+        backoff: BackoffPolicy | None = None,
+        pacer: AimdPacer | None = None,
+        breakers: dict[str, CircuitBreaker] | None = None,
+        on_request: RequestHook | None = None,
+        max_concurrency: int = 4,
+        max_concurrency_per_proxy: int = 2,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_concurrency_per_proxy = max(1, max_concurrency_per_proxy)
+
+        # примитивы asyncio создаются внутри работающего event loop
+        self._semaphore: asyncio.Semaphore | None = None
+        self._proxy_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._reset_lock: asyncio.Lock | None = None
+        self._ready: asyncio.Event | None = None
+
+        super().__init__(
+            proxy=proxy,
+            cookies=cookies,
+            timeout=timeout,
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+            block_threshold=block_threshold,
+            backoff=backoff,
+            pacer=pacer,
+            breakers=breakers,
+            on_request=on_request,
+        )
+
+    def _build_client(self) -> None:
+        # сессия создаётся лениво в event loop, см. _get_client
+        return None
+
+    def _init_primitives(self) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._reset_lock = asyncio.Lock()
+            self._ready = asyncio.Event()
+            self._ready.set()
+
+    async def _get_client(self) -> requests.AsyncSession:
+        if self._client is None:
+            # провайдер cookies может ходить в сеть, не блокируем loop
+            params = await asyncio.to_thread(self._session_params)
+            if self._client is None:
+                self._identity = self._session_identity(params)
+                self._client = requests.AsyncSession(**params)
+        return self._client
+
+    @asynccontextmanager
+    async def _slot(self, proxy_key: str):
+        proxy_semaphore = self._proxy_semaphores.get(proxy_key)
+        if proxy_semaphore is None:
+            proxy_semaphore = asyncio.Semaphore(self.max_concurrency_per_proxy)
+            self._proxy_semaphores[proxy_key] = proxy_semaphore
+        async with self._semaphore, proxy_semaphore:
+            yield
+
+    async def _reset_client_async(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                await client.close()
+            except Exception as err:
+                logger.debug(f"Ошибка при закрытии сессии: {err}")
+
+    async def _on_block(self) -> None:
+        async with self._reset_lock:
+            # блокировку мог уже обработать другой запрос
+            if self._block_attempts < self.block_threshold:
+                return
+            self._ready.clear()
+            try:
+                await asyncio.to_thread(self._handle_block)
+                params = await asyncio.to_thread(self._session_params)
+                if self._client is not None and self._session_identity(params) == self._identity:
+                    # те же прокси и профиль TLS - соединения не рвём
+                    self._update_session(self._client, params)
+                else:
+                    await self._reset_client_async()
+                    self._identity = self._session_identity(params)
+                    self._client = requests.AsyncSession(**params)
+            finally:
+                self._block_attempts = 0
+                self._ready.set()
+
+    async def request(self, method: str, url: str, endpoint: str | None = None, **kwargs):
+        self._init_primitives()
+        last_exc = None
+        delay = None
+        breaker = self.breakers.get(endpoint)
+
+        for attempt in range(1, self.max_retries + 1):
+            # пока идёт смена cookies/ip новые запросы не отправляем
+            await self._ready.wait()
+            if breaker:
+                breaker.allow()
+            if self.proxy.rotating:
+                await asyncio.to_thread(self.proxy.wait_ready)
+            if self.pacer:
+                await self.pacer.wait_async()
+            proxy_url = self._request_proxy(kwargs)
+            proxy_key = proxy_url or "direct"
+            started = None
+            try:
+                async with self._slot(proxy_key):
+                    client = await self._get_client()
+                    started = time.perf_counter()
+                    response = await client.request(
+                        method,
+                        url,
+                        timeout=self.timeout,
+                        **kwargs,
+                    )
+                self._trace(method, url, endpoint, attempt, response, started, proxy_url)
+                if breaker:
+                    breaker.record_status(response.status_code)
+
+                if self.cookies:
+                    self.cookies.update(response)
+
+                if response.status_code in BLOCK_STATUS_CODES:
+                    if self.pacer:
+                        self.pacer.on_block()
+                    self._block_attempts += 1
+                    logger.warning(
+                        f"Запрос заблокирован ({response.status_code}) к {url}, "
+                        f"попытка {self._block_attempts}"
+                    )
+
+                    if self._block_attempts >= self.block_threshold:
+                        # отмена запроса (страницу больше не ждут) не должна прерывать смену cookies/ip
+                        await asyncio.shield(self._on_block())
+
+                    delay = self._retry_delay(attempt, delay, response)
+                    if delay is not None:
+                        await asyncio.sleep(delay)
+                    continue
+
+                self._block_attempts = 0
+                response.raise_for_status()
+                if self.pacer:
+                    self.pacer.on_success()
+                return response
+
+            except requests.RequestsError as e:
+                last_exc = e
+                self._block_attempts = 0
+                logger.warning(f"Request error (attempt {attempt}): {e}")
+                if started is not None and not getattr(getattr(e, "response", None), "status_code", None):
+                    self._trace(method, url, endpoint, attempt, None, started, proxy_url)
+                if self._record_error(breaker, e):
+                    continue
+                delay = self._retry_delay(attempt, delay, getattr(e, "response", None))
+                if delay is not None:
+                    await asyncio.sleep(delay)
+
+        raise RuntimeError("HTTP запросы были неуспешными") from last_exc
+
+    async def aclose(self) -> None:
+        """Закрывает сессию, вызывать в конце работы event loop"""
+        await self._reset_client_async()
+        self._semaphore = None
+        self._proxy_semaphores.clear()
+        self._reset_lock = None
+        self._ready = None
@@ -0,0 +1,62 @@
+"""
+Паузы между повторами запросов: экспоненциальный рост со случайным разбросом (jitter) и учёт Retry-After
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+STRATEGIES = ("fixed", "exponential", "decorrelated")
+
+
+@dataclass
+class BackoffPolicy:
+    """
+    fixed - всегда base (как было раньше)
+    exponential - случайно от 0 до base * 2^(попытка-1), но не больше cap ("full jitter")
+    decorrelated - случайно от base до утроенной прошлой паузы, но не больше cap:
+    параллельные запросы расходятся во времени и не повторяются одновременно
+    """
+    base: float = 5
+    cap: float = 60
+    strategy: str = "decorrelated"
+    retry_after_cap: float = 300  # дольше этого не ждём, даже если сервер просит
+    rng: random.Random = field(default_factory=random.Random, repr=False)
+
+    def __post_init__(self):
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Неизвестная стратегия пауз {self.strategy}, доступны {', '.join(STRATEGIES)}")
+        self.cap = max(self.cap, self.base)
+
+    def next_delay(self, attempt: int, previous: float | None = None, retry_after: float | None = None) -> float:
+        """Пауза перед попыткой attempt + 1, previous - прошлая пауза в этом запросе"""
+        if self.strategy == "fixed":
+            delay = self.base
+        elif self.strategy == "exponential":
+            delay = self.rng.uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+        else:
+            delay = min(self.cap, self.rng.uniform(self.base, max(self.base, (previous or self.base) * 3)))
+
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_after_cap))
+        return delay
+
+
+def parse_retry_after(response) -> float | None:
+    """Retry-After в секундах: число или HTTP-дата"""
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,116 @@
+"""
+Предохранитель (circuit breaker) для внешних сервисов: отдельно для API каталога, страниц объявлений и сервисов spfa.
+После breaker_failures неудач подряд запросы к этому сервису сразу завершаются ошибкой (без попыток и пауз),
+через breaker_reset секунд пропускается один пробный запрос: удачный закрывает предохранитель, неудачный открывает снова.
+Неудача - нет ответа или код 5xx. Блокировки (403/429) неудачей не считаются: сервис отвечает
+"""
+import threading
+import time
+
+from loguru import logger
+
+from dto import AvitoConfig
+
+CATALOG_API = "catalog_api"
+ITEM_HTML = "item_html"
+SPFA_COOKIES = "spfa_cookies"
+SPFA_PHONE = "spfa_phone"
+SPFA_URL = "spfa_url"
+ENDPOINTS = (CATALOG_API, ITEM_HTML, SPFA_COOKIES, SPFA_PHONE, SPFA_URL)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Сервис недоступен, запрос не отправлялся"""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def allow(self) -> None:
+        """Пропускает запрос или выбрасывает CircuitOpenError"""
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN:
+                left = self.reset_timeout - (time.monotonic() - self._opened_at)
+                if left > 0:
+                    raise CircuitOpenError(f"{self.name}: сервис недоступен, следующая проверка через {left:.0f} сек.")
+                self._state = HALF_OPEN
+            # в полуоткрытом состоянии идёт только один пробный запрос (зависший не держит вечно)
+            now = time.monotonic()
+            if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                raise CircuitOpenError(f"{self.name}: сервис недоступен, идёт проверка")
+            self._probe_started = now
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"{self.name}: сервис снова доступен")
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_started = None
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state == CLOSED:
+                    logger.warning(
+                        f"{self.name}: {self._failures} неудач подряд, запросы приостановлены "
+                        f"на {self.reset_timeout} сек."
+                    )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def record_status(self, status_code: int | None) -> None:
+        """Итог запроса по коду ответа: нет ответа (None, 0) и 5xx - неудача"""
+        if not status_code or status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+_breakers: dict[str, CircuitBreaker] | None = None
+_breakers_lock = threading.Lock()
+
+
+def build_breakers(config: AvitoConfig) -> dict[str, CircuitBreaker]:
+    """Один набор на процесс, пустой при breaker_failures = 0"""
+    global _breakers
+    if config.breaker_failures <= 0:
+        return {}
+    with _breakers_lock:
+        if _breakers is None:
+            _breakers = {
+                endpoint: CircuitBreaker(
+                    name=endpoint,
+                    failure_threshold=config.breaker_failures,
+                    reset_timeout=config.breaker_reset,
+                )
+                for endpoint in ENDPOINTS
+            }
+    return _breakers
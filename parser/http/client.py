@@ -1,13 +1,22 @@
 """
 Клиент для запросов парсера (curl_cffi)
 """
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
 from curl_cffi import requests
 from loguru import logger
 
 from parser.cookies.base import CookiesProvider
+from parser.http.backoff import BackoffPolicy, parse_retry_after
+from parser.http.breaker import CircuitBreaker
+from parser.http.pacer import AimdPacer
+from parser.http.tracing import RequestEvent, RequestHook, proxy_label
 from parser.proxies.proxy import Proxy
 
+BLOCK_STATUS_CODES = (403, 429, 439)
+
 
 class HttpClient:
     def __init__(
@@ -18,6 +27,10 @@ class HttpClient:
         max_retries: int = 5,
         retry_delay: int = 5,
         block_threshold: int = 3,
+        backoff: BackoffPolicy | None = None,
+        pacer: AimdPacer | None = None,
+        breakers: dict[str, CircuitBreaker] | None = None,
+        on_request: RequestHook | None = None,
     ):
         self.proxy = proxy
         self.cookies = cookies
@@ -25,11 +38,42 @@ class HttpClient:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.block_threshold = block_threshold
+        self.backoff = backoff or BackoffPolicy(base=retry_delay)
+        self.pacer = pacer
+        self.breakers = breakers or {}
+        self.on_request = on_request
 
         self._block_attempts = 0
+        # следующая сессия готовится в фоне с первой блокировки серии, к лимиту она уже готова
+        self._standby: Future | None = None
+        self._swap_pending = False
+        self._standby_executor: ThreadPoolExecutor | None = None
+        self._swap_lock = threading.Lock()
+        self._identity: tuple | None = None
         self._client = self._build_client()
 
     def _build_client(self) -> requests.Session:
+        params = self._session_params()
+        self._identity = self._session_identity(params)
+        return requests.Session(**params)
+
+    @staticmethod
+    def _session_identity(params: dict) -> tuple:
+        """То, что нельзя поменять у открытой сессии: профиль TLS и прокси"""
+        proxies = params.get("proxies") or {}
+        return params.get("impersonate"), proxies.get("https")
+
+    @staticmethod
+    def _update_session(client, params: dict) -> None:
+        """Новые заголовки и cookies без закрытия соединений и TLS-сессий"""
+        client.headers.clear()
+        client.headers.update(params["headers"])
+        client.cookies.clear()
+        if params.get("cookies"):
+            client.cookies.update(params["cookies"])
+
+    def _session_params(self) -> dict:
+        """Заголовки, cookies, прокси и профиль TLS для новой сессии"""
         fingerprint = self.cookies.get_fingerprint() if self.cookies else None
         fingerprint = fingerprint if isinstance(fingerprint, dict) else {}
         fingerprint_headers = fingerprint.get("headers", {})
@@ -46,7 +90,6 @@ class HttpClient:
         )
         is_mobile = " Mobile " in user_agent
         impersonate = fingerprint.get("impersonate") or "chrome"
-        session = requests.Session(impersonate=impersonate)
         default_headers = {
             'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
             'accept-language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
@@ -60,65 +103,185 @@ class HttpClient:
         }
         headers = {**default_headers, **fingerprint_headers}
         headers["user-agent"] = user_agent
-        session.headers.update(headers)
+        params = {"impersonate": impersonate, "headers": headers}
         if self.cookies:
-            session.cookies.update(self.cookies.get())
+            params["cookies"] = self.cookies.get()
 
         proxy = self.proxy.get_httpx_proxy()
         if proxy:
-            session.proxies = {
+            params["proxies"] = {
                 "http": proxy,
                 "https": proxy,
             }
 
-        return session
+        return params
 
-    def _reset_client(self) -> None:
-        self._client.close()
-        self._client = self._build_client()
+    def _handle_block(self) -> None:
+        logger.warning("Блокировка, в фоне меняю cookies/ip и готовлю новую сессию")
+        if self.cookies:
+            self.cookies.handle_block()
+        self.proxy.handle_block()
+
+    def _next_session(self) -> tuple[dict, requests.Session | None]:
+        """Выполняется в фоне: смена cookies/ip и сборка новой сессии, если её нельзя обновить на месте"""
+        self._handle_block()
+        params = self._session_params()
+        if self._session_identity(params) == self._identity:
+            return params, None
+        return params, requests.Session(**params)
 
-    def request(self, method: str, url: str, **kwargs):
+    def _prepare_standby(self) -> None:
+        if self._standby is not None:
+            return
+        if self._standby_executor is None:
+            self._standby_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="http-standby")
+        self._standby = self._standby_executor.submit(self._next_session)
+
+    def _swap_client(self) -> None:
+        """
+        Подменяет сессию подготовленной, ждёт её, если она ещё не готова.
+        Если подготовить не удалось, остаётся текущая сессия, следующая блокировка попробует снова
+        """
+        with self._swap_lock:
+            self._swap_pending = False
+            standby, self._standby = self._standby, None
+            if standby is None:
+                return
+            try:
+                params, client = standby.result()
+            except Exception as err:
+                logger.warning(f"Не удалось подготовить новую сессию, продолжаю с текущей: {err}")
+                return
+            if client is None:
+                self._update_session(self._client, params)
+                return
+            old_client, self._client = self._client, client
+            self._identity = self._session_identity(params)
+        old_client.close()
+
+    def _retry_delay(self, attempt: int, previous: float | None, response=None) -> float | None:
+        """Пауза перед следующей попыткой, None - попыток больше нет"""
+        if attempt >= self.max_retries:
+            return None
+        retry_after = parse_retry_after(response)
+        delay = self.backoff.next_delay(attempt=attempt, previous=previous, retry_after=retry_after)
+        if retry_after is not None:
+            logger.info(f"Сервер просит подождать {retry_after:.0f} сек., пауза {delay:.1f} сек.")
+        return delay
+
+    @staticmethod
+    def _record_error(breaker: CircuitBreaker | None, error: Exception) -> bool:
+        """Учитывает ошибку запроса, True - сервис признан недоступным и повторять не нужно"""
+        if breaker is None:
+            return False
+        # ответ с кодом уже учтён в record_status, у curl_cffi без ответа status_code = 0
+        if not getattr(getattr(error, "response", None), "status_code", None):
+            breaker.record_failure()
+        return breaker.is_open
+
+    def _trace(
+            self,
+            method: str,
+            url: str,
+            endpoint: str | None,
+            attempt: int,
+            response,
+            started: float,
+            proxy_url: str | None,
+    ) -> None:
+        """Событие попытки для хука on_request"""
+        if self.on_request is None:
+            return
+        status = getattr(response, "status_code", None) or None
+        self.on_request(RequestEvent(
+            method=method,
+            endpoint=endpoint,
+            url=url,
+            status=status,
+            bytes=len(response.content) if status else 0,
+            latency=time.perf_counter() - started,
+            attempt=attempt,
+            proxy=proxy_label(proxy_url),
+            proxy_url=proxy_url,
+        ))
+
+    def _request_proxy(self, kwargs: dict) -> str | None:
+        """Прокси этой попытки. Пул выбирает прокси на каждый запрос, остальные заданы в сессии"""
+        proxy_url = self.proxy.get_httpx_proxy()
+        if self.proxy.per_request and proxy_url:
+            kwargs["proxies"] = {"http": proxy_url, "https": proxy_url}
+        return proxy_url
+
+    def request(self, method: str, url: str, endpoint: str | None = None, **kwargs):
+        """endpoint - класс запроса для предохранителя (см. parser/http/breaker.py)"""
         last_exc = None
+        delay = None
+        breaker = self.breakers.get(endpoint)
 
         for attempt in range(1, self.max_retries + 1):
+            if breaker:
+                breaker.allow()
+            started = None
+            proxy_url = None
             try:
+                if self._swap_pending:
+                    self._swap_client()
+                if self.proxy.rotating:
+                    # запросы ждут, пока мобильный прокси сменит IP
+                    self.proxy.wait_ready()
+                if self.pacer:
+                    self.pacer.wait()
+                proxy_url = self._request_proxy(kwargs)
+                started = time.perf_counter()
                 response = self._client.request(
                     method,
                     url,
                     timeout=self.timeout,
                     **kwargs,
                 )
+                self._trace(method, url, endpoint, attempt, response, started, proxy_url)
+                if breaker:
+                    breaker.record_status(response.status_code)
 
                 if self.cookies:
                     self.cookies.update(response)
 
-                print(response.url)
-                if response.status_code in (403, 429, 439):
+                if response.status_code in BLOCK_STATUS_CODES:
+                    if self.pacer:
+                        self.pacer.on_block()
                     self._block_attempts += 1
                     logger.warning(
                         f"Запрос заблокирован ({response.status_code}) к {url}, "
                         f"попытка {self._block_attempts}"
                     )
 
+                    # смена cookies/ip начинается с первой блокировки серии и идёт параллельно с паузами
+                    self._prepare_standby()
                     if self._block_attempts >= self.block_threshold:
-                        logger.warning("Достигнут лимит блокировок, запускается обработка")
-                        if self.cookies:
-                            self.cookies.handle_block()
-                        self.proxy.handle_block()
-                        self._reset_client()
+                        self._swap_pending = True
                         self._block_attempts = 0
 
-                    time.sleep(self.retry_delay)
+                    delay = self._retry_delay(attempt, delay, response)
+                    if delay is not None:
+                        time.sleep(delay)
                     continue
 
                 self._block_attempts = 0
                 response.raise_for_status()
+                if self.pacer:
+                    self.pacer.on_success()
                 return response
 
             except requests.RequestsError as e:
                 last_exc = e
                 self._block_attempts = 0
                 logger.warning(f"Request error (attempt {attempt}): {e}")
-                time.sleep(self.retry_delay)
+                if started is not None and not getattr(getattr(e, "response", None), "status_code", None):
+                    self._trace(method, url, endpoint, attempt, None, started, proxy_url)
+                if self._record_error(breaker, e):
+                    continue
+                delay = self._retry_delay(attempt, delay, getattr(e, "response", None))
+                if delay is not None:
+                    time.sleep(delay)
 
         raise RuntimeError("HTTP запросы были неуспешными") from last_exc
\ No newline at end of file
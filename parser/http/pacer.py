@@ -0,0 +1,87 @@
+"""
+Адаптивный темп запросов (AIMD): пока ответы успешные, темп растёт на постоянную величину,
+при блокировке (403/429/439) умножается на коэффициент меньше 1.
+Так парсер держится чуть ниже порога, после которого начинаются блокировки
+"""
+import asyncio
+import threading
+import time
+
+from dto import AvitoConfig
+
+
+class AimdPacer:
+    def __init__(
+        self,
+        min_rate: float = 0.2,
+        max_rate: float = 5.0,
+        start_rate: float = 1.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self._rate = min(max(start_rate, self.min_rate), self.max_rate)
+        self._next_at = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """Текущий темп, запросов в секунду"""
+        return self._rate
+
+    def _reserve(self) -> float:
+        """Занимает ближайший свободный слот, возвращает сколько до него ждать"""
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at)
+            self._next_at = at + 1 / self._rate
+            return at - now
+
+    def wait(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._rate = min(self.max_rate, self._rate + self.increase)
+
+    def on_block(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            # блокировки запросов, отправленных ещё на старом темпе, второй раз не снижают
+            if now - self._last_decrease < 1 / self._rate:
+                return
+            self._last_decrease = now
+            self._rate = max(self.min_rate, self._rate * self.decrease)
+            self._next_at = max(self._next_at, now + 1 / self._rate)
+
+
+_pacer: AimdPacer | None = None
+_pacer_lock = threading.Lock()
+
+
+def build_pacer(config: AvitoConfig) -> AimdPacer | None:
+    """Один на процесс: подобранный темп переходит в следующий цикл"""
+    global _pacer
+    if not config.pacer:
+        return None
+    with _pacer_lock:
+        if _pacer is None:
+            _pacer = AimdPacer(
+                min_rate=config.pacer_min_rate,
+                max_rate=config.pacer_max_rate,
+                start_rate=config.pacer_start_rate,
+                increase=config.pacer_increase,
+                decrease=config.pacer_decrease,
+            )
+    return _pacer
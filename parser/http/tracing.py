@@ -0,0 +1,131 @@
+"""
+События запросов парсера: HttpClient после каждой попытки вызывает хук с RequestEvent.
+LatencyStats - сводка за цикл (гистограмма задержек, коды ответов, трафик по классам запросов),
+SampledLogSink - запись части событий в лог для отладки
+"""
+import random
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+# верхние границы корзин гистограммы, сек.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+@dataclass(slots=True)
+class RequestEvent:
+    method: str
+    endpoint: str | None
+    url: str
+    status: int | None  # None - ответа нет
+    bytes: int
+    latency: float  # сек.
+    attempt: int
+    proxy: str | None  # хост:порт без логина и пароля
+    proxy_url: str | None = None  # полная строка прокси, с логином и паролем - не для лога
+
+
+RequestHook = Callable[[RequestEvent], None]
+
+
+def proxy_label(proxy_url: str | None) -> str | None:
+    if not proxy_url:
+        return None
+    parts = urlsplit(proxy_url)
+    return f"{parts.hostname}:{parts.port}" if parts.port else parts.hostname
+
+
+class RequestHooks:
+    """Рассылает событие всем хукам, ошибка одного не мешает остальным и запросу"""
+
+    def __init__(self, hooks: list[RequestHook] | None = None):
+        self.hooks = list(hooks or [])
+
+    def add(self, hook: RequestHook) -> None:
+        self.hooks.append(hook)
+
+    def __call__(self, event: RequestEvent) -> None:
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as err:
+                logger.debug(f"Ошибка обработчика события запроса: {err}")
+
+
+class LatencyStats:
+    """Гистограмма задержек по классам запросов, сбрасывается в начале цикла"""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts: dict[str, list[int]] = {}
+            self._statuses: dict[str, dict[int | None, int]] = {}
+            self._bytes: dict[str, int] = {}
+            self._total: dict[str, float] = {}
+
+    def __call__(self, event: RequestEvent) -> None:
+        endpoint = event.endpoint or "other"
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, [0] * (len(self.buckets) + 1))
+            counts[bisect_left(self.buckets, event.latency)] += 1
+            statuses = self._statuses.setdefault(endpoint, {})
+            statuses[event.status] = statuses.get(event.status, 0) + 1
+            self._bytes[endpoint] = self._bytes.get(endpoint, 0) + event.bytes
+            self._total[endpoint] = self._total.get(endpoint, 0.0) + event.latency
+
+    def quantile(self, endpoint: str, q: float) -> float | None:
+        """Оценка квантиля по гистограмме: верхняя граница корзины, None - нет данных"""
+        with self._lock:
+            return self._quantile(self._counts.get(endpoint, []), q)
+
+    def _quantile(self, counts: list[int], q: float) -> float | None:
+        total = sum(counts)
+        if not total:
+            return None
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= q * total:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def summary(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for endpoint, counts in sorted(self._counts.items()):
+                count = sum(counts)
+                statuses = ", ".join(
+                    f"{'нет ответа' if status is None else status}: {number}"
+                    for status, number in sorted(self._statuses[endpoint].items(), key=lambda item: item[0] or 0)
+                )
+                lines.append(
+                    f"{endpoint}: {count} запросов, в среднем {self._total[endpoint] / count:.2f} сек., "
+                    f"p50 <= {self._quantile(counts, 0.5)} сек., p95 <= {self._quantile(counts, 0.95)} сек., "
+                    f"{self._bytes[endpoint] / 1024:.0f} КБ ({statuses})"
+                )
+        return lines
+
+
+class SampledLogSink:
+    """Пишет в лог (DEBUG) долю sample_rate событий"""
+
+    def __init__(self, sample_rate: float, rng: random.Random | None = None):
+        self.sample_rate = sample_rate
+        self.rng = rng or random.Random()
+
+    def __call__(self, event: RequestEvent) -> None:
+        if self.sample_rate < 1 and self.rng.random() >= self.sample_rate:
+            return
+        logger.debug(
+            f"{event.method} {event.url} [{event.endpoint or '-'}] -> {event.status or 'нет ответа'}, "
+            f"{event.bytes} байт, {event.latency * 1000:.0f} мс, попытка {event.attempt}, "
+            f"прокси {event.proxy or 'нет'}"
+        )
@@ -0,0 +1,90 @@
+"""
+Конвейер обработки страниц: каждая стадия в своём потоке,
+между стадиями очереди ограниченного размера (backpressure)
+"""
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from loguru import logger
+
+_END = object()
+
+
+@dataclass
+class PageTask:
+    """Страница каталога, которая идёт по конвейеру"""
+    link_index: int
+    source_url: str
+    page: int | None = None
+    payload: dict | None = None
+    ads: list = field(default_factory=list)
+    link_done: bool = False
+    watermark: tuple | None = None  # (прошлая отметка, новая) для ссылки
+
+
+class Pipeline:
+    def __init__(
+        self,
+        stages: list[tuple[str, Callable[[Any], Any]]],
+        queue_size: int = 4,
+        stop_event=None,
+    ):
+        self.stages = stages
+        self.stop_event = stop_event
+        self._queues = [
+            queue.Queue(maxsize=max(1, queue_size)) for _ in stages
+        ]
+
+    def _is_stopped(self) -> bool:
+        return bool(self.stop_event and self.stop_event.is_set())
+
+    def _run_stage(self, index: int) -> None:
+        name, handler = self.stages[index]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self._queues) else None
+
+        while True:
+            item = inbox.get()
+            if item is _END:
+                if outbox is not None:
+                    outbox.put(_END)
+                return
+
+            # после остановки только вычитываем очередь, чтобы не держать producer
+            if self._is_stopped():
+                continue
+
+            try:
+                result = handler(item)
+            except Exception as err:
+                logger.exception(f"Ошибка на стадии {name}: {err}")
+                continue
+
+            if result is not None and outbox is not None:
+                outbox.put(result)
+
+    def run(self, producer: Callable[[Callable[[Any], None]], None]) -> None:
+        """
+        producer выполняется в текущем потоке и кладёт задачи через put,
+        put блокируется, пока первая стадия не освободит место
+        """
+        threads = [
+            threading.Thread(
+                target=self._run_stage,
+                args=(index,),
+                name=f"pipeline-{name}",
+                daemon=True,
+            )
+            for index, (name, _) in enumerate(self.stages)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            producer(self._queues[0].put)
+        finally:
+            self._queues[0].put(_END)
+            for thread in threads:
+                thread.join()
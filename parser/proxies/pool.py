@@ -0,0 +1,173 @@
+"""
+Пул прокси: каждый запрос идёт через самый здоровый прокси пула.
+
+По каждому прокси считаются (скользящим средним) доля успешных ответов, доля блокировок (403/429/439)
+и время ответа. Ошибка без ответа считается не быстрее timeout, иначе прокси, который сразу отказывает
+в соединении, выглядел бы самым быстрым. Выбирается прокси с наименьшим временем ответа с поправкой
+на блокировки и ошибки, для прокси без статистики берётся медиана пула. После block_threshold блокировок
+или ошибок подряд прокси уходит на паузу proxy_cooldown секунд, а если у него есть ссылка смены IP -
+IP меняется в фоне, парсер в это время работает через остальные прокси.
+Пул один на процесс (build_proxy), статистика и паузы переходят в следующий цикл
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from statistics import median
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from parser.http.client import BLOCK_STATUS_CODES
+from parser.http.tracing import RequestEvent, proxy_label
+from .proxy import MobileProxy, Proxy, ServerProxy
+
+# вес свежего наблюдения в скользящих средних
+ALPHA = 0.2
+# во сколько раз блокировка и ошибка "дороже" обычного времени ответа
+BLOCK_PENALTY = 4
+FAILURE_PENALTY = 4
+
+
+@dataclass
+class PoolEntry:
+    proxy: ServerProxy | MobileProxy
+    url: str
+    label: str
+    latency: float | None = None
+    success_rate: float = 1.0
+    block_rate: float = 0.0
+    blocks_in_row: int = 0
+    failures_in_row: int = 0
+    requests: int = 0
+    cooldown_until: float = 0.0
+    rotating: bool = field(default=False, repr=False)
+
+    def score(self, default_latency: float) -> float:
+        """Меньше - лучше, default_latency - для прокси, у которого ещё нет времени ответа"""
+        latency = default_latency if self.latency is None else self.latency
+        return latency * (1 + BLOCK_PENALTY * self.block_rate + FAILURE_PENALTY * (1 - self.success_rate))
+
+
+def parse_pool_entry(value: str, **mobile_options) -> ServerProxy | MobileProxy:
+    """"login:pass@host:port" или "login:pass@host:port|ссылка смены IP", mobile_options - для MobileProxy"""
+    proxy_string, _, change_ip_url = (part.strip() for part in value.partition("|"))
+    if change_ip_url:
+        return MobileProxy(proxy_string, change_ip_url, **mobile_options)
+    return ServerProxy(proxy_string)
+
+
+class ProxyPool(Proxy):
+    per_request = True
+
+    def __init__(
+            self,
+            proxies: list[ServerProxy | MobileProxy],
+            block_threshold: int = 3,
+            cooldown: float = 120,
+            timeout: float = 20,
+    ):
+        if not proxies:
+            raise ValueError("Пул прокси пуст")
+        self.block_threshold = max(1, block_threshold)
+        self.cooldown = cooldown
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._entries: list[PoolEntry] = []
+        # у одного хоста:порта бывают разные логины (сессии провайдера), поэтому ключ - полная строка
+        self._by_url: dict[str, PoolEntry] = {}
+        for proxy in proxies:
+            url = proxy.get_httpx_proxy()
+            if url in self._by_url:
+                logger.warning(f"Прокси {proxy_label(url)} указан в пуле дважды, второй пропущен")
+                continue
+            entry = PoolEntry(proxy=proxy, url=url, label=proxy_label(url))
+            self._entries.append(entry)
+            self._by_url[url] = entry
+        self._name_shared_hosts()
+        self._last_blocked: PoolEntry | None = None
+
+    def _name_shared_hosts(self) -> None:
+        """Для лога: у прокси с одинаковым хостом:портом к подписи добавляется логин"""
+        labels = [entry.label for entry in self._entries]
+        for entry in self._entries:
+            username = urlsplit(entry.url).username
+            if labels.count(entry.label) > 1 and username:
+                entry.label = f"{username}@{entry.label}"
+
+    def get_httpx_proxy(self) -> str:
+        with self._lock:
+            now = time.monotonic()
+            ready = [entry for entry in self._entries if entry.cooldown_until <= now]
+            if ready:
+                default_latency = self._median_latency()
+                entry = min(ready, key=lambda item: item.score(default_latency))
+            else:
+                # все на паузе - тот, у кого пауза кончится раньше
+                entry = min(self._entries, key=lambda item: item.cooldown_until)
+            return entry.url
+
+    def _median_latency(self) -> float:
+        known = [entry.latency for entry in self._entries if entry.latency is not None]
+        return median(known) if known else self.timeout
+
+    def observe(self, event: RequestEvent) -> None:
+        entry = self._by_url.get(event.proxy_url)
+        if entry is None:
+            return
+
+        blocked = event.status in BLOCK_STATUS_CODES
+        failed = event.status is None or event.status >= 500
+        # ошибка без ответа обходится не дешевле таймаута
+        latency = max(event.latency, self.timeout) if event.status is None else event.latency
+        with self._lock:
+            entry.requests += 1
+            entry.block_rate += ALPHA * (blocked - entry.block_rate)
+            entry.success_rate += ALPHA * ((not failed) - entry.success_rate)
+            entry.latency = latency if entry.latency is None else (
+                entry.latency + ALPHA * (latency - entry.latency)
+            )
+            entry.blocks_in_row = entry.blocks_in_row + 1 if blocked else 0
+            entry.failures_in_row = entry.failures_in_row + 1 if failed else 0
+            if blocked:
+                self._last_blocked = entry
+            cool_down = max(entry.blocks_in_row, entry.failures_in_row) >= self.block_threshold
+        if cool_down:
+            self._cool_down(entry)
+
+    def handle_block(self):
+        """Лимит блокировок в HttpClient: на паузу последний заблокированный прокси, если он ещё не на паузе"""
+        entry = self._last_blocked
+        if entry is None or entry.cooldown_until > time.monotonic():
+            return
+        self._cool_down(entry)
+
+    def _cool_down(self, entry: PoolEntry) -> None:
+        with self._lock:
+            entry.blocks_in_row = 0
+            entry.failures_in_row = 0
+            entry.cooldown_until = time.monotonic() + self.cooldown
+            rotate = isinstance(entry.proxy, MobileProxy) and not entry.rotating
+            entry.rotating = entry.rotating or rotate
+        logger.warning(f"Прокси {entry.label} заблокирован или не отвечает, пауза {self.cooldown} сек.")
+        if rotate:
+            threading.Thread(target=self._rotate, args=(entry,), name="proxy-rotate", daemon=True).start()
+
+    def _rotate(self, entry: PoolEntry) -> None:
+        proxy = entry.proxy
+        try:
+            if not (proxy.handle_block() and proxy.wait_ready() and proxy.confirmed):
+                return
+            with self._lock:
+                # новый IP - старая статистика блокировок к нему не относится
+                entry.cooldown_until = 0.0
+                entry.block_rate = 0.0
+        finally:
+            entry.rotating = False
+
+    def summary(self) -> list[str]:
+        with self._lock:
+            return [
+                f"{entry.label}: {entry.requests} запросов, успешных {entry.success_rate:.0%}, "
+                f"блокировок {entry.block_rate:.0%}, ответ {entry.latency or 0:.2f} сек."
+                for entry in self._entries
+            ]
@@ -1,9 +1,15 @@
+import threading
+import time
 from abc import ABC, abstractmethod
+
 import requests
 from loguru import logger
 
 
 class Proxy(ABC):
+    # прокси выбирается на каждый запрос (пул), а не один раз на сессию
+    per_request = False
+
     @abstractmethod
     def get_httpx_proxy(self) -> dict | None:
         pass
@@ -12,6 +18,21 @@ class Proxy(ABC):
     def handle_block(self):
         pass
 
+    @property
+    def rotating(self) -> bool:
+        """Идёт смена IP, запросы нужно придержать"""
+        return False
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Ждёт окончания смены IP, False - не дождались"""
+        return True
+
+    def observe(self, event) -> None:
+        """Итог запроса (parser.http.tracing.RequestEvent), нужен пулу для выбора прокси"""
+
+    def summary(self) -> list[str]:
+        return []
+
 
 class NoProxy(Proxy):
     def get_httpx_proxy(self):
@@ -33,18 +54,107 @@ class ServerProxy(Proxy):
 
 
 class MobileProxy(Proxy):
-    def __init__(self, url, change_ip_url):
+    """
+    Мобильный прокси со сменой IP по ссылке.
+    Смена идёт в фоне: handle_block сразу возвращается, а запросы ждут в wait_ready, пока новый IP
+    не подтвердится через probe_url (ответ - внешний IP) или не выйдет rotate_timeout.
+    Чаще, чем раз в min_interval секунд, IP не меняется
+    """
+
+    def __init__(
+        self,
+        url,
+        change_ip_url,
+        probe_url: str | None = None,
+        min_interval: float = 30,
+        rotate_timeout: float = 60,
+    ):
         self.url = url
         self.change_ip_url = change_ip_url
+        self.probe_url = probe_url
+        self.min_interval = min_interval
+        self.rotate_timeout = rotate_timeout
+        self.last_ip: str | None = None
+        self.confirmed = False  # удалась ли последняя смена IP
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._done.set()
+        self._last_rotation = 0.0
 
     def get_httpx_proxy(self):
         return f"http://{self.url}"
 
-    def handle_block(self):
+    @property
+    def rotating(self) -> bool:
+        return not self._done.is_set()
+
+    def handle_block(self) -> bool:
+        """Запускает смену IP в фоне. False - смена не нужна: IP меняли меньше min_interval секунд назад"""
+        with self._lock:
+            if self.rotating:
+                return True
+            now = time.monotonic()
+            left = self.min_interval - (now - self._last_rotation)
+            if self._last_rotation and left > 0:
+                logger.info(f"IP прокси менялся недавно, следующая смена не раньше чем через {left:.0f} сек.")
+                return False
+            self._last_rotation = now
+            self._done.clear()
+        threading.Thread(target=self._rotate, name="proxy-rotate", daemon=True).start()
+        return True
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        return self._done.wait(self.rotate_timeout if timeout is None else timeout)
+
+    def _rotate(self) -> None:
+        try:
+            self.confirmed = self._change_ip()
+        except Exception as err:
+            self.confirmed = False
+            logger.warning(f"Не удалось сменить IP прокси: {err}")
+        finally:
+            self._done.set()
+
+    def _change_ip(self) -> bool:
+        deadline = time.monotonic() + self.rotate_timeout
+        old_ip = self.last_ip or self._probe()
+
         # делаем запрос на смену IP
         params = {
             "format": "json"
         }
         res = requests.get(self.change_ip_url, params=params, timeout=10)
-        if res.status_code == 200:
-            logger.success(f"новый IP {res.json().get('new_ip')}")
+        if res.status_code != 200:
+            logger.warning(f"Смена IP не удалась, статус {res.status_code}")
+            return False
+        try:
+            new_ip = res.json().get("new_ip")
+        except ValueError:
+            new_ip = None
+        if not self.probe_url:
+            self.last_ip = new_ip
+            logger.success(f"новый IP {new_ip}")
+            return True
+
+        # IP считается сменённым, когда через прокси виден новый внешний адрес
+        while time.monotonic() < deadline:
+            ip = self._probe()
+            if ip and (ip == new_ip if new_ip else ip != old_ip):
+                self.last_ip = ip
+                logger.success(f"новый IP {ip}")
+                return True
+            time.sleep(1)
+        logger.warning(f"Новый IP не подтвердился за {self.rotate_timeout} сек.")
+        return False
+
+    def _probe(self) -> str | None:
+        """Внешний IP через прокси (probe_url отвечает адресом текстом), None - прокси пока не отвечает"""
+        if not self.probe_url:
+            return None
+        proxy = self.get_httpx_proxy()
+        try:
+            res = requests.get(self.probe_url, proxies={"http": proxy, "https": proxy}, timeout=10)
+        except requests.RequestException:
+            return None
+        return res.text.strip() if res.status_code == 200 else None
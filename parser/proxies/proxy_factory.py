@@ -1,8 +1,15 @@
+import threading
+
 from loguru import logger
 
 from dto import AvitoConfig
+from .pool import ProxyPool, parse_pool_entry
 from .proxy import NoProxy, ServerProxy, MobileProxy, Proxy
 
+# пул один на процесс: статистика и паузы прокси переходят в следующий цикл
+_pools: dict[tuple, ProxyPool] = {}
+_pools_lock = threading.Lock()
+
 
 def build_proxy(config: AvitoConfig) -> Proxy:
     """
@@ -11,9 +18,42 @@ def build_proxy(config: AvitoConfig) -> Proxy:
     if config.proxy_change_url and not config.proxy_string:
         raise ValueError("proxy_change_url указан без proxy_string")
 
+    mobile_options = {
+        "probe_url": config.proxy_probe_url or None,
+        "min_interval": config.proxy_rotate_interval,
+        "rotate_timeout": config.proxy_rotate_timeout,
+    }
+
+    if config.proxy_pool:
+        entries = [value for value in config.proxy_pool if value.strip()]
+        if config.proxy_string:
+            entries.insert(
+                0,
+                f"{config.proxy_string}|{config.proxy_change_url}" if config.proxy_change_url else config.proxy_string,
+            )
+        key = (
+            tuple(entries),
+            tuple(mobile_options.values()),
+            config.block_threshold,
+            config.proxy_cooldown,
+            config.timeout,
+        )
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                proxies = [parse_pool_entry(value, **mobile_options) for value in entries]
+                logger.info(f"Пул из {len(proxies)} прокси")
+                pool = _pools[key] = ProxyPool(
+                    proxies,
+                    block_threshold=config.block_threshold,
+                    cooldown=config.proxy_cooldown,
+                    timeout=config.timeout,
+                )
+        return pool
+
     if config.proxy_string and config.proxy_change_url:
         logger.info("Прокси определен как мобильный")
-        return MobileProxy(config.proxy_string, config.proxy_change_url)
+        return MobileProxy(config.proxy_string, config.proxy_change_url, **mobile_options)
 
     if config.proxy_string:
         logger.info("Прокси определен как серверный")
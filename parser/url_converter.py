@@ -6,6 +6,8 @@ from threading import Lock
 import requests
 from loguru import logger
 
+from parser.http.breaker import CircuitBreaker
+
 
 SPFA_AVITO_URL_ENDPOINT = "https://spfa.pro/api/avito-url/"
 
@@ -21,10 +23,12 @@ class AvitoUrlConverter:
         cache_path: str | Path = "storage/avito_api_urls.json",
         min_request_interval: float = 31.0,
         timeout: int = 20,
+        breaker: CircuitBreaker | None = None,
     ):
         self.cache_path = Path(cache_path)
         self.min_request_interval = min_request_interval
         self.timeout = timeout
+        self.breaker = breaker
         self._cache = self._load_cache()
 
     def convert(self, url: str) -> str:
@@ -41,14 +45,23 @@ class AvitoUrlConverter:
             if cached_url:
                 return cached_url
 
+            if self.breaker:
+                self.breaker.allow()
             self._wait_for_rate_limit()
-            response = requests.post(
-                SPFA_AVITO_URL_ENDPOINT,
-                json={"url": url},
-                headers={"Content-Type": "application/json"},
-                timeout=self.timeout,
-            )
+            try:
+                response = requests.post(
+                    SPFA_AVITO_URL_ENDPOINT,
+                    json={"url": url},
+                    headers={"Content-Type": "application/json"},
+                    timeout=self.timeout,
+                )
+            except requests.RequestException:
+                if self.breaker:
+                    self.breaker.record_failure()
+                raise
             type(self)._last_request_at = time.monotonic()
+            if self.breaker:
+                self.breaker.record_status(response.status_code)
 
             if response.status_code != 200:
                 raise RuntimeError(self._format_error(response))
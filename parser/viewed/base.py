@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
+
+from models import Item
+
+
+class ViewedStore(ABC):
+    """
+    Память уже просмотренных объявлений (id, цена) и отметок ссылок.
+    Парсер и фильтры работают только через этот интерфейс
+    """
+    name: str = "unknown"
+    # одно хранилище можно открыть из нескольких процессов (workers > 1)
+    multiprocess_safe: bool = False
+
+    @abstractmethod
+    def record_exists(self, record_id, price) -> bool:
+        """Видели ли объявление с такой ценой"""
+        pass
+
+    @abstractmethod
+    def filter_unseen(self, pairs: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """Пары (id, price), которых ещё не видели, порядок сохраняется"""
+        pass
+
+    @abstractmethod
+    def add_record_from_page(self, ads: list[Item]) -> None:
+        """Запоминает объявления пачкой"""
+        pass
+
+    def add_record(self, ad: Item) -> None:
+        self.add_record_from_page(ads=[ad])
+
+    @abstractmethod
+    def iter_pairs(self) -> Iterator[tuple[int, int]]:
+        """Все (id, price) по возрастанию - для выгрузки снимка"""
+        pass
+
+    @abstractmethod
+    def add_pairs(self, pairs: Iterable[tuple[int, int]]) -> None:
+        """Запоминает (id, price) без объявлений - для загрузки снимка"""
+        pass
+
+    @abstractmethod
+    def get_watermark(self, url: str) -> tuple[int, int] | None:
+        """Самое свежее (sortTimeStamp, id), которое видели по ссылке"""
+        pass
+
+    @abstractmethod
+    def set_watermark(self, url: str, sort_ts: int, ad_id: int) -> None:
+        pass
+
+    def invalidate_cache(self) -> None:
+        """Хранилище менялось в обход этого объекта (другие процессы)"""
+        pass
+
+    def set_busy(self, busy: bool) -> None:
+        """Идёт цикл парсинга - фоновое обслуживание можно отложить"""
+        pass
+
+    def stop_maintenance(self) -> None:
+        """Последний цикл парсинга - остановить фоновое обслуживание"""
+        pass
+
+    def close(self) -> None:
+        """Освобождает файлы и подключения, следующий вызов откроет их заново"""
+        pass
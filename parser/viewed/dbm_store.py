@@ -0,0 +1,82 @@
+"""
+Хранилище на встроенной key-value БД из стандартной библиотеки (dbm: gnu, ndbm или dumb - что есть в сборке Python).
+Ключ - 16 байт (id, цена), без SQL и без разбора запросов
+"""
+import dbm
+import struct
+import threading
+import time
+from typing import Iterable, Iterator
+
+from models import Item
+from parser.viewed.base import ViewedStore
+
+_PAIR = struct.Struct(">qq")  # (id, цена) и (sortTimeStamp, id)
+_TIME = struct.Struct(">q")
+_VIEWED_PREFIX = b"v"
+_WATERMARK_PREFIX = b"w"
+
+
+def _viewed_key(record_id, price) -> bytes:
+    return _VIEWED_PREFIX + _PAIR.pack(record_id, price)
+
+
+class DbmViewedStore(ViewedStore):
+    name = "dbm"
+
+    def __init__(self, path: str = "viewed_dbm"):
+        self.path = path
+        self._db = None
+        # объекты dbm не потокобезопасны
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._db is None:
+            self._db = dbm.open(self.path, "c")
+        return self._db
+
+    def record_exists(self, record_id, price) -> bool:
+        with self._lock:
+            return _viewed_key(record_id, price) in self._open()
+
+    def filter_unseen(self, pairs: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        with self._lock:
+            db = self._open()
+            return [pair for pair in pairs if _viewed_key(*pair) not in db]
+
+    def add_record_from_page(self, ads: list[Item]) -> None:
+        self.add_pairs((ad.id, ad.priceDetailed.value) for ad in ads)
+
+    def iter_pairs(self) -> Iterator[tuple[int, int]]:
+        with self._lock:
+            keys = [key for key in self._open().keys() if key[:1] == _VIEWED_PREFIX]
+        # big-endian: порядок байтов совпадает с порядком чисел (id и цены не отрицательные)
+        keys.sort()
+        return (_PAIR.unpack_from(key, 1) for key in keys)
+
+    def add_pairs(self, pairs: Iterable[tuple[int, int]]) -> None:
+        now = _TIME.pack(int(time.time()))
+        with self._lock:
+            db = self._open()
+            for pair in pairs:
+                db[_viewed_key(*pair)] = now
+
+    def get_watermark(self, url: str) -> tuple[int, int] | None:
+        with self._lock:
+            value = self._open().get(_WATERMARK_PREFIX + url.encode())
+        return _PAIR.unpack(value) if value else None
+
+    def set_watermark(self, url: str, sort_ts: int, ad_id: int) -> None:
+        with self._lock:
+            db = self._open()
+            db[_WATERMARK_PREFIX + url.encode()] = _PAIR.pack(sort_ts, ad_id)
+
+    def close(self) -> None:
+        """
+        Сбрасывает изменения на диск. Вызывается в конце каждого цикла:
+        dbm.dumb при каждом sync переписывает индекс целиком, поэтому не после каждой страницы
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,64 @@
+import os
+import threading
+
+from db_service import SQLiteDBHandler, SQLitePriceHistory
+from dto import AvitoConfig
+from parser.viewed.base import ViewedStore
+from parser.viewed.dbm_store import DbmViewedStore
+from parser.viewed.memory import MemoryViewedStore
+
+DEFAULT_PATHS = {
+    "sqlite": "database.db",
+    "dbm": "viewed_dbm",
+    "memory": "",
+}
+
+# одно хранилище на файл в процессе: его делят парсеры всех циклов
+_stores: dict[tuple[str, str], ViewedStore] = {}
+_stores_lock = threading.Lock()
+_price_histories: dict[str, SQLitePriceHistory] = {}
+
+
+def build_viewed_store(config: AvitoConfig) -> ViewedStore:
+    backend = config.viewed_backend
+    if backend not in DEFAULT_PATHS:
+        raise ValueError(f"Неизвестный viewed_backend: {backend}, доступны {', '.join(DEFAULT_PATHS)}")
+
+    path = config.viewed_db_path or DEFAULT_PATHS[backend]
+    key = (backend, os.path.abspath(path) if path else "")
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _create_store(config, backend, path)
+            _stores[key] = store
+    return store
+
+
+def _create_store(config: AvitoConfig, backend: str, path: str) -> ViewedStore:
+    if backend == "dbm":
+        return DbmViewedStore(path=path)
+    if backend == "memory":
+        return MemoryViewedStore()
+    return SQLiteDBHandler(
+        db_name=path,
+        use_cache=config.viewed_cache,
+        cache_fp_rate=config.viewed_cache_fp_rate,
+        cache_max_mb=config.viewed_cache_max_mb,
+        retention_days=config.viewed_max_age_days,
+        retention_rows=config.viewed_max_rows,
+    )
+
+
+def build_price_history(config: AvitoConfig) -> SQLitePriceHistory | None:
+    """История цен всегда в sqlite: рядом с viewed или в database.db, если viewed в другом хранилище"""
+    if not config.price_history:
+        return None
+
+    path = config.viewed_db_path if config.viewed_backend == "sqlite" else ""
+    path = os.path.abspath(path or DEFAULT_PATHS["sqlite"])
+    with _stores_lock:
+        history = _price_histories.get(path)
+        if history is None:
+            history = SQLitePriceHistory(db_name=path)
+            _price_histories[path] = history
+    return history
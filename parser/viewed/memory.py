@@ -0,0 +1,42 @@
+import threading
+from typing import Iterable, Iterator
+
+from models import Item
+from parser.viewed.base import ViewedStore
+
+
+class MemoryViewedStore(ViewedStore):
+    """Всё в памяти процесса, после перезапуска объявления придут повторно"""
+    name = "memory"
+
+    def __init__(self):
+        self._seen: set[tuple[int, int]] = set()
+        self._watermarks: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def record_exists(self, record_id, price) -> bool:
+        return (record_id, price) in self._seen
+
+    def filter_unseen(self, pairs: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        seen = self._seen
+        return [pair for pair in pairs if pair not in seen]
+
+    def add_record_from_page(self, ads: list[Item]) -> None:
+        with self._lock:
+            self._seen.update((ad.id, ad.priceDetailed.value) for ad in ads)
+
+    def iter_pairs(self) -> Iterator[tuple[int, int]]:
+        with self._lock:
+            pairs = sorted(self._seen)
+        return iter(pairs)
+
+    def add_pairs(self, pairs: Iterable[tuple[int, int]]) -> None:
+        with self._lock:
+            self._seen.update(pairs)
+
+    def get_watermark(self, url: str) -> tuple[int, int] | None:
+        return self._watermarks.get(url)
+
+    def set_watermark(self, url: str, sort_ts: int, ad_id: int) -> None:
+        with self._lock:
+            self._watermarks[url] = (sort_ts, ad_id)
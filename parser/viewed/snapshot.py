@@ -0,0 +1,141 @@
+"""
+Снимок просмотренных объявлений для обмена между несколькими запусками (контейнерами).
+
+Формат: заголовок MAGIC, версия, число пар; дальше zlib-поток из пар (id - предыдущий id, price)
+по 8 байт big-endian. Пары отсортированы по (id, price) и не повторяются, поэтому разница id
+не отрицательная, в основном маленькая и хорошо сжимается.
+
+Снимки и хранилище объединяются слиянием отсортированных потоков: в хранилище уходят только
+отсутствующие пары, одной отсортированной пачкой за раз
+"""
+import heapq
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from loguru import logger
+
+from parser.viewed.base import ViewedStore
+
+MAGIC = b"AVVS"
+VERSION = 1
+_HEADER = struct.Struct(">4sBQ")
+_PAIR = struct.Struct(">qq")
+CHUNK_PAIRS = 65_536
+MERGE_BATCH = 50_000
+
+
+def write_snapshot(path: str | Path, pairs: Iterable[tuple[int, int]]) -> int:
+    """pairs - по возрастанию (id, price), повторы пропускаются. Возвращает число записанных пар"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    count = 0
+    previous = None
+    compressor = zlib.compressobj(level=6)
+    with tmp_path.open("wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, 0))
+        chunk = []
+        last_id = 0
+        for pair in pairs:
+            if previous is not None and pair <= previous:
+                if pair == previous:
+                    continue
+                raise ValueError(f"Пары для снимка не отсортированы: {pair} после {previous}")
+            previous = pair
+            chunk.append(pair[0] - last_id)
+            chunk.append(pair[1])
+            last_id = pair[0]
+            count += 1
+            if len(chunk) >= CHUNK_PAIRS * 2:
+                file.write(compressor.compress(struct.pack(f">{len(chunk)}q", *chunk)))
+                chunk = []
+        if chunk:
+            file.write(compressor.compress(struct.pack(f">{len(chunk)}q", *chunk)))
+        file.write(compressor.flush())
+        file.seek(0)
+        file.write(_HEADER.pack(MAGIC, VERSION, count))
+    # не оставляем полузаписанный снимок, если его в это время читает другой узел
+    tmp_path.replace(path)
+    return count
+
+
+def read_snapshot(path: str | Path) -> Iterator[tuple[int, int]]:
+    """Пары из снимка по возрастанию"""
+    with Path(path).open("rb") as file:
+        magic, version, count = _HEADER.unpack(file.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} - не снимок просмотренных или неизвестная версия {version}")
+
+        decompressor = zlib.decompressobj()
+        tail = b""
+        last_id = 0
+        read = 0
+        while block := file.read(1024 * 1024):
+            data = tail + decompressor.decompress(block)
+            usable = len(data) - len(data) % _PAIR.size
+            tail = data[usable:]
+            for delta, price in _PAIR.iter_unpack(data[:usable]):
+                last_id += delta
+                read += 1
+                yield last_id, price
+        if tail or read != count:
+            raise ValueError(f"Снимок {path} повреждён: ожидалось {count} пар, прочитано {read}")
+
+
+def merge_sorted(*streams: Iterable[tuple[int, int]]) -> Iterator[tuple[int, int]]:
+    """Слияние отсортированных потоков пар без повторов"""
+    previous = None
+    for pair in heapq.merge(*streams):
+        if pair != previous:
+            previous = pair
+            yield pair
+
+
+def missing_pairs(
+        incoming: Iterable[tuple[int, int]],
+        existing: Iterable[tuple[int, int]],
+) -> Iterator[tuple[int, int]]:
+    """Пары из incoming, которых нет в existing. Оба потока по возрастанию"""
+    existing = iter(existing)
+    current = next(existing, None)
+    for pair in incoming:
+        while current is not None and current < pair:
+            current = next(existing, None)
+        if pair != current:
+            yield pair
+
+
+def merge_into_store(store: ViewedStore, paths: Iterable[str | Path]) -> int:
+    """Добавляет в хранилище пары из снимков, которых в нём ещё нет. Возвращает число добавленных"""
+    snapshots = [read_snapshot(path) for path in paths]
+    if not snapshots:
+        return 0
+
+    added = 0
+    batch = []
+    for pair in missing_pairs(merge_sorted(*snapshots), store.iter_pairs()):
+        batch.append(pair)
+        if len(batch) >= MERGE_BATCH:
+            store.add_pairs(batch)
+            added += len(batch)
+            batch = []
+    if batch:
+        store.add_pairs(batch)
+        added += len(batch)
+    return added
+
+
+def load_peer_snapshots(store: ViewedStore, paths: list[str]) -> None:
+    """Снимки других узлов при старте: отсутствующие файлы пропускаются"""
+    existing = [path for path in paths if Path(path).is_file()]
+    for path in set(paths) - set(existing):
+        logger.warning(f"Снимок просмотренных {path} не найден, пропускаю")
+    if not existing:
+        return
+    try:
+        added = merge_into_store(store, existing)
+    except (OSError, ValueError, zlib.error) as err:
+        logger.error(f"Не удалось загрузить снимки просмотренных: {err}")
+        return
+    logger.info(f"Из снимков других узлов добавлено {added} просмотренных объявлений")
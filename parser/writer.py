@@ -0,0 +1,117 @@
+"""
+Отложенная запись (write-behind): просмотренные объявления и результаты пишет отдельный поток,
+парсер не ждёт БД и файлы посреди обхода.
+
+Гарантии:
+- задания выполняются в порядке поступления; просмотренные, накопившиеся с нескольких страниц,
+  пишутся одной транзакцией до следующего задания (сохранение результатов, отметка ссылки)
+- после flush() и close() всё отправленное записано и закоммичено
+- при аварийном завершении процесса теряется только то, что ещё в очереди (не больше queue_size
+  заданий): эти объявления не попадут в database.db и придут повторно в следующем цикле
+- очередь ограничена: если запись не успевает, парсер ждёт в save_viewed / submit
+- queue_size = 0 - запись сразу в вызывающем потоке, как раньше
+
+Гарантии проверяются в tests/test_writer.py (python -m pytest tests)
+"""
+import queue
+import threading
+from typing import Any, Callable
+
+from loguru import logger
+
+_STOP = object()
+
+
+class WriteBehind:
+    def __init__(self, write_viewed: Callable[[list], None], queue_size: int = 64):
+        self.write_viewed = write_viewed
+        self.queue_size = queue_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.queue_size > 0
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def save_viewed(self, ads: list) -> None:
+        if not ads:
+            return
+        if not self._running():
+            self.write_viewed(ads)
+            return
+        self._queue.put(("viewed", list(ads)))
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> None:
+        if not self._running():
+            fn(*args, **kwargs)
+            return
+        self._queue.put(("job", (fn, args, kwargs)))
+
+    def flush(self) -> None:
+        """Ждёт, пока всё отправленное будет записано"""
+        if self._running():
+            self._queue.join()
+
+    def close(self) -> None:
+        if not self._running():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # забираем всё, что накопилось, пока шла прошлая запись
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = self._process(batch)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _process(self, batch: list) -> bool:
+        viewed = []
+        for item in batch:
+            if item is _STOP:
+                self._write_viewed(viewed)
+                return True
+
+            kind, payload = item
+            if kind == "viewed":
+                viewed.extend(payload)
+                continue
+
+            # результаты и отметки ссылки пишутся после просмотренных, пришедших раньше них
+            self._write_viewed(viewed)
+            viewed = []
+            fn, args, kwargs = payload
+            try:
+                fn(*args, **kwargs)
+            except Exception as err:
+                logger.exception(f"Ошибка отложенной записи: {err}")
+
+        self._write_viewed(viewed)
+        return False
+
+    def _write_viewed(self, ads: list) -> None:
+        if not ads:
+            return
+        try:
+            self.write_viewed(ads)
+        except Exception as err:
+            logger.exception(f"Ошибка отложенной записи просмотренных: {err}")
@@ -1,7 +1,12 @@
+import asyncio
 import json
+import multiprocessing
 import random
-import re
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from contextlib import aclosing
+from dataclasses import replace
 from datetime import datetime, timedelta
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
@@ -10,56 +15,105 @@ from loguru import logger
 from pydantic import ValidationError
 
 from common_data import HEADERS
-from db_service import SQLiteDBHandler
 from dto import Proxy, AvitoConfig
 from filters.ads_filter import AdsFilter
 from hide_private_data import log_config
 from integrations.notifications.factory import build_notifier
 from load_config import load_avito_config
-from models import ItemsResponse, Item
+from models import Item, decode_items
+from parser.catalog import CatalogLocator, loads
+from parser.claims import ViewedClaims, SharedViewedClaims
 from parser.cookies.factory import build_cookies_provider
 from parser.export.factory import build_result_storage
+from parser.export.memory import MemoryResultStorage
+from parser.http.async_client import AsyncHttpClient
+from parser.http.backoff import BackoffPolicy
+from parser.http.breaker import CATALOG_API, ITEM_HTML, SPFA_URL, build_breakers
 from parser.http.client import HttpClient
+from parser.http.pacer import build_pacer
+from parser.http.tracing import LatencyStats, RequestHooks, SampledLogSink
+from parser.pipeline import Pipeline, PageTask
 from parser.proxies.proxy_factory import build_proxy
 from parser.url_converter import AvitoUrlConverter
+from parser.viewed.factory import build_price_history, build_viewed_store
+from parser.viewed.snapshot import load_peer_snapshots
+from parser.writer import WriteBehind
 from utils.parse_phone import ParsePhone
+from utils.enrich import enrich_ads, PROMOTION_TITLE
+from utils.file_log import setup_file_log
 from version import VERSION
 from lang import SPFA_PROXY_REQUIRED
 
 DEBUG_MODE = False
 
-logger.add("logs/app.log", rotation="5 MB", retention="5 days", level="DEBUG")
-
 
 class AvitoParse:
     def __init__(
             self,
             config: AvitoConfig,
-            stop_event=None
+            stop_event=None,
+            worker_id: int | None = None,
     ):
         self.config = config
+        self.worker_id = worker_id
         self.proxy = build_proxy(self.config)
-        self.cookies_provider = build_cookies_provider(config=config, proxy=self.proxy)
-        self.db_handler = SQLiteDBHandler()
+        self.cookies_provider = build_cookies_provider(
+            config=config, proxy=self.proxy, worker_id=worker_id
+        )
+        self.viewed_store = build_viewed_store(config=config)
+        self.price_history = build_price_history(config=config)
+        self._cycle_started = int(time.time())
         self.notifier = build_notifier(config=config)
         self.result_storage = None
-        self.url_converter = AvitoUrlConverter()
+        self.breakers = build_breakers(config=config)
+        self.catalogs = CatalogLocator()
+        self.url_converter = AvitoUrlConverter(breaker=self.breakers.get(SPFA_URL))
         self.stop_event = stop_event
         self.headers = HEADERS
         self.good_request_count = 0
         self.bad_request_count = 0
+        self.pacer = build_pacer(config=config)
+        self.request_stats = LatencyStats()
+        self.request_hooks = RequestHooks([self.request_stats, self.proxy.observe])
+        if config.trace_sample_rate > 0:
+            self.request_hooks.add(SampledLogSink(sample_rate=config.trace_sample_rate))
         self.http = HttpClient(
             proxy=self.proxy,
             cookies=self.cookies_provider,
             timeout=config.timeout,
             max_retries=self.config.max_count_of_retry,
             retry_delay=config.retry_delay,
-            block_threshold=config.block_threshold
+            block_threshold=config.block_threshold,
+            backoff=self._build_backoff(),
+            pacer=self.pacer,
+            breakers=self.breakers,
+            on_request=self.request_hooks,
+        )
+        self.async_http: AsyncHttpClient | None = None
+        self._process_lock: asyncio.Lock | None = None
+        self.viewed_claims = ViewedClaims()
+        self._pipeline_results: dict[int, list[Item]] = {}
+        # у воркера результаты каждой ссылки копятся отдельно и уходят в основной процесс
+        self.link_storages: dict[int, MemoryResultStorage] | None = None
+        self.writer = WriteBehind(
+            write_viewed=self.__save_viewed,
+            queue_size=config.write_queue_size,
+        )
+        self.ads_filter = AdsFilter(
+            config=config,
+            viewed_store=self.viewed_store,
         )
-        self.ads_filter = AdsFilter(config=config, is_viewed_fn=self.is_viewed)
         log_config(config=self.config, version=VERSION)
 
 
+    def _build_backoff(self) -> BackoffPolicy:
+        """Одна политика пауз для всех запросов парсера: API каталога и страницы объявлений"""
+        return BackoffPolicy(
+            base=self.config.retry_delay,
+            cap=self.config.retry_delay_max,
+            strategy=self.config.retry_backoff,
+        )
+
     def get_proxy_obj(self) -> Proxy | None:
         if all([self.config.proxy_string, self.config.proxy_change_url]):
             return Proxy(
@@ -74,7 +128,7 @@ class AvitoParse:
             return None
 
         try:
-            response = self.http.request("GET", url)
+            response = self.http.request("GET", url, endpoint=ITEM_HTML)
             self.good_request_count += 1
             return response.text
 
@@ -103,43 +157,104 @@ class AvitoParse:
 
         page_url = self._api_url_for_page(api_url, page)
         try:
-            response = self.http.request("GET", page_url)
+            response = self.http.request("GET", page_url, endpoint=CATALOG_API)
             self.good_request_count += 1
-            return response.json()
+            return self._read_catalog(api_url=api_url, raw=response.content)
         except Exception as err:
             self.bad_request_count += 1
             logger.warning(f"Ошибка при запросе API {page_url}: {err}")
             return None
 
-    @staticmethod
-    def _extract_api_catalog(payload: dict) -> dict:
-        if not isinstance(payload, dict):
-            return {}
-
-        result = payload.get("result")
-        candidates = [
-            payload.get("catalog"),
-            result.get("catalog") if isinstance(result, dict) else None,
-            result,
-            payload,
-        ]
-        return next(
-            (
-                candidate
-                for candidate in candidates
-                if isinstance(candidate, dict)
-                and isinstance(candidate.get("items"), list)
-            ),
-            {},
-        )
+    def _read_catalog(self, api_url: str, raw: bytes) -> dict:
+        """
+        Каталог из ответа API по запомненному для api_url пути, дальше по нему сразу берутся items.
+        Если каталога в ответе нет - весь ответ, ошибку покажет валидация
+        """
+        payload = loads(raw)
+        catalog = self.catalogs.locate(api_url=api_url, payload=payload)
+        return payload if catalog is None else catalog
     def parse(self):
+        self._cycle_started = int(time.time())
+        self.request_stats.reset()
+        self.viewed_store.set_busy(True)
+        self.writer.start()
+        try:
+            self._parse_cycle()
+        finally:
+            # дописываем очередь и при остановке, и при ошибке
+            self.writer.close()
+            self.viewed_store.set_busy(False)
+            if self._last_cycle():
+                self.viewed_store.stop_maintenance()
+                if self.cookies_provider is not None:
+                    self.cookies_provider.close()
+            # при закрытии последнего подключения sqlite переносит WAL в основной файл
+            self.viewed_store.close()
+            if self.price_history is not None:
+                self.price_history.close()
+
+    def _last_cycle(self) -> bool:
+        """После этого цикла следующего не будет: one_time_start или остановка"""
+        if self.config.one_time_start:
+            return True
+        return bool(self.stop_event and self.stop_event.is_set())
+
+    def _parse_cycle(self):
         if not self.config.one_file_for_link:
             self.result_storage = build_result_storage(config=self.config)
 
+        api_urls = self._convert_urls()
+        if api_urls is None:
+            return
+
+        sharded = self.config.workers > 1
+        if sharded and not self.viewed_store.multiprocess_safe:
+            logger.warning(
+                f"Хранилище {self.viewed_store.name} нельзя делить между процессами, workers игнорируется"
+            )
+            sharded = False
+
+        if sharded:
+            self._parse_sharded(api_urls=api_urls)
+        else:
+            self._crawl(links=self._links(api_urls=api_urls))
+
+        if self.stop_event and self.stop_event.is_set():
+            return
+
+        self._finish()
+
+    def _links(self, api_urls: dict[str, str]) -> list[tuple[int, str, str]]:
+        """(номер ссылки, ссылка, API URL) для ссылок, которые удалось перевести в API"""
+        return [
+            (link_index, source_url, api_urls[source_url])
+            for link_index, source_url in enumerate(self.config.urls)
+            if api_urls.get(source_url)
+        ]
+
+    def _crawl(self, links: list[tuple[int, str, str]]) -> None:
+        """Обход ссылок в режиме crawl_mode, в том числе в процессе-воркере"""
+        if self.cookies_provider is not None:
+            self.cookies_provider.start_cycle()
+        if self.config.crawl_mode == "async":
+            asyncio.run(self._parse_async(links=links))
+        elif self.config.crawl_mode == "pipeline":
+            self._parse_pipeline(links=links)
+        else:
+            for link_index, source_url, api_url in links:
+                if self.stop_event and self.stop_event.is_set():
+                    return
+                self._parse_link(
+                    link_index=link_index,
+                    source_url=source_url,
+                    api_url=api_url,
+                )
+
+    def _convert_urls(self) -> dict[str, str] | None:
         api_urls = {}
         for source_url in self.config.urls:
             if self.stop_event and self.stop_event.is_set():
-                return
+                return None
             try:
                 api_urls[source_url] = self.url_converter.convert(source_url)
             except Exception as err:
@@ -147,19 +262,434 @@ class AvitoParse:
                     f"Не удалось преобразовать ссылку Avito в API URL "
                     f"{source_url}: {err}"
                 )
+        return api_urls
+
+    def _catalog_unavailable(self) -> bool:
+        """API каталога признано недоступным: остальные страницы ссылки не запрашиваем"""
+        breaker = self.breakers.get(CATALOG_API)
+        if breaker is None or not breaker.is_open:
+            return False
+        logger.warning("API каталога недоступно, перехожу к следующей ссылке")
+        return True
+
+    @property
+    def _page_pause(self) -> float:
+        """Пауза между страницами: с адаптивным темпом запросы разносит pacer"""
+        return 0 if self.pacer is not None else self.config.pause_between_links
+
+    def _storage_for_link(self, link_index: int):
+        if self.link_storages is not None:
+            return self.link_storages[link_index]
+        if self.config.one_file_for_link:
+            return build_result_storage(
+                config=self.config,
+                link_index=link_index,
+            )
+        return self.result_storage
 
-        for link_index, source_url in enumerate(self.config.urls):
-            api_url = api_urls.get(source_url)
-            if not api_url:
+    def _parse_link(self, link_index: int, source_url: str, api_url: str) -> None:
+        result_storage = self._storage_for_link(link_index=link_index)
+        watermark = self._get_watermark(source_url=source_url)
+        newest = watermark
+
+        ads_in_link = []
+        for page in range(1, self.config.count + 1):
+            logger.info(f"page={page}")
+            if self.stop_event and self.stop_event.is_set():
+                return
+
+            json_data = self.fetch_api_data(api_url=api_url, page=page)
+            if not json_data:
+                if self._catalog_unavailable():
+                    break
+                logger.warning(
+                    f"Не удалось получить данные API для {source_url}, "
+                    f"повтор через {self.config.pause_between_links} сек."
+                )
+                time.sleep(self.config.pause_between_links)
                 continue
 
-            if self.config.one_file_for_link:
-                self.result_storage = build_result_storage(
-                    config=self.config,
+            ads = self._decode_page(catalog=json_data)
+            if ads is None:
+                continue
+
+            if not ads:
+                logger.info(
+                    "Объявления закончились, завершаю работу с данной ссылкой"
+                )
+                break
+
+            ads_in_link.extend(self._process_ads(ads=ads))
+
+            marks = self._page_marks(ads=ads)
+            newest = self._newest_mark(newest, marks)
+            if self._reached_watermark(watermark, marks):
+                logger.info("Дошли до уже просмотренных объявлений, завершаю работу с данной ссылкой")
+                break
+
+            if self._page_pause:
+                logger.info(f"Пауза {self._page_pause} сек.")
+                time.sleep(self._page_pause)
+
+        self.writer.submit(self._save_results, result_storage=result_storage, ads=ads_in_link)
+        self.writer.submit(self._save_watermark, source_url=source_url, mark=newest, previous=watermark)
+
+    def _get_watermark(self, source_url: str) -> tuple[int, int] | None:
+        if not self.config.use_watermark:
+            return None
+        try:
+            return self.viewed_store.get_watermark(url=source_url)
+        except Exception as err:
+            logger.warning(f"Не удалось прочитать отметку для {source_url}: {err}")
+            return None
+
+    def _save_watermark(
+            self,
+            source_url: str,
+            mark: tuple[int, int] | None,
+            previous: tuple[int, int] | None,
+    ) -> None:
+        if not self.config.use_watermark or not mark or mark == previous:
+            return
+        try:
+            self.viewed_store.set_watermark(url=source_url, sort_ts=mark[0], ad_id=mark[1])
+        except Exception as err:
+            logger.warning(f"Не удалось сохранить отметку для {source_url}: {err}")
+
+    @staticmethod
+    def _page_marks(ads: list[Item]) -> list[tuple[int, int]]:
+        """(sortTimeStamp, id) объявлений страницы. Продвинутые не учитываем - они бывают старыми"""
+        return [
+            (ad.sortTimeStamp, ad.id)
+            for ad in ads
+            if ad.sortTimeStamp and isinstance(ad.id, int) and not ad.isPromotion
+        ]
+
+    @staticmethod
+    def _raw_page_marks(catalog: dict) -> list[tuple[int, int]]:
+        """То же, что _page_marks, но по сырому каталогу без валидации"""
+        items = catalog.get("items") or []
+        return [
+            (item["sortTimeStamp"], item["id"])
+            for item in items
+            if isinstance(item, dict)
+            and isinstance(item.get("sortTimeStamp"), int)
+            and isinstance(item.get("id"), int)
+            and not any(
+                isinstance(vas, dict) and vas.get("title") == PROMOTION_TITLE
+                for step in ((item.get("iva") or {}).get("DateInfoStep") or [])
+                for vas in ((step or {}).get("payload") or {}).get("vas", [])
+            )
+        ]
+
+    @staticmethod
+    def _newest_mark(
+            mark: tuple[int, int] | None,
+            marks: list[tuple[int, int]],
+    ) -> tuple[int, int] | None:
+        return max([m for m in (mark, *marks) if m], default=None)
+
+    @staticmethod
+    def _reached_watermark(
+            watermark: tuple[int, int] | None,
+            marks: list[tuple[int, int]],
+    ) -> bool:
+        """На странице есть объявления не новее отметки прошлого цикла"""
+        return bool(watermark) and any(mark[0] <= watermark[0] for mark in marks)
+
+    def _decode_page(self, catalog: dict) -> list[Item] | None:
+        """
+        Валидирует страницу каталога (из _read_catalog). None - ошибка валидации, [] - объявления закончились
+        """
+        try:
+            items = decode_items(catalog, lazy=self.config.fast_decoding)
+        except ValidationError as err:
+            logger.error(
+                f"При валидации объявлений произошла ошибка: {err}"
+            )
+            return None
+
+        ads = self._clean_null_ads(ads=items)
+        logger.info(f"Объявлений перед фильтрацией {len(ads)}")
+        ads = enrich_ads(ads=ads)
+        if self.price_history is not None and ads:
+            # цены всех объявлений страницы, в том числе уже просмотренных
+            self.writer.submit(self._record_prices, ads)
+        return ads
+
+    def _record_prices(self, ads: list[Item]) -> None:
+        try:
+            self.price_history.record_page(ads=ads)
+        except Exception as err:
+            logger.info(f"При сохранении истории цен ошибка {err}")
+
+    def _notify_price_drops(self) -> None:
+        if self.price_history is None or not self.config.price_drop_percent:
+            return
+        drops = self.price_history.drops(
+            percent=self.config.price_drop_percent,
+            since=self._cycle_started,
+        )
+        if not drops:
+            return
+        logger.info(f"Цена снизилась у {len(drops)} объявлений")
+        self.notifier.notify_price_drops(drops=drops, percent=self.config.price_drop_percent)
+
+    def _process_ads(self, ads: list[Item]) -> list[Item]:
+        """Фильтр -> уведомления -> доп. данные -> сохранение просмотренных"""
+        filtered_ads = self.viewed_claims.claim(self.filter_ads(ads=ads))
+        self.notifier.notify_many(ads=filtered_ads)
+        filtered_ads = self.parse_views(ads=filtered_ads)
+        filtered_ads = self.parse_phone(ads=filtered_ads)
+
+        self.writer.save_viewed(ads=filtered_ads)
+        return filtered_ads
+
+    @staticmethod
+    def _save_results(result_storage, ads: list[Item]) -> None:
+        if ads:
+            logger.info(f"Сохраняю {len(ads)} объявлений")
+            result_storage.save(ads)
+        else:
+            logger.info("Сохранять нечего")
+
+    def _finish(self) -> None:
+        self.writer.flush()
+        self._notify_price_drops()
+        logger.info(
+            f"Хорошие запросы: {self.good_request_count}шт, "
+            f"плохие: {self.bad_request_count}шт"
+        )
+        if self.pacer is not None:
+            logger.info(
+                f"Темп запросов: {self.pacer.rate:.2f}/сек "
+                f"(от {self.pacer.min_rate} до {self.pacer.max_rate})"
+            )
+        for line in self.request_stats.summary():
+            logger.info(f"Запросы {line}")
+        for line in self.proxy.summary():
+            logger.info(f"Прокси {line}")
+        if self.cookies_provider is not None:
+            for line in self.cookies_provider.summary():
+                logger.info(f"Cookies: {line}")
+
+        if self.config.one_time_start:
+            self.notifier.notify(
+                message="Парсинг Авито завершён. Все ссылки обработаны"
+            )
+            self.stop_event = True
+
+    def _parse_sharded(self, api_urls: dict[str, str]) -> None:
+        """
+        Ссылки делятся между config.workers процессами.
+        У каждого процесса свой HttpClient и cookies, БД просмотренных общая,
+        а объявления, взятые в работу, отмечаются в общем для всех наборе
+        """
+        links = self._links(api_urls=api_urls)
+        workers = min(self.config.workers, len(links))
+        if not workers:
+            return
+        shards = [links[worker_id::workers] for worker_id in range(workers)]
+        logger.info(f"Запускаю {workers} процессов, ссылок: {len(links)}")
+
+        context = multiprocessing.get_context("spawn")
+        results: dict[int, list[Item]] = {}
+        with context.Manager() as manager:
+            stop_event = manager.Event()
+            claims = (manager.dict(), manager.Lock())
+
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [
+                    pool.submit(
+                        _run_shard, self.config, shard, worker_id, workers, stop_event, claims
+                    )
+                    for worker_id, shard in enumerate(shards)
+                ]
+                pending = futures
+                while pending:
+                    if self.stop_event and self.stop_event.is_set():
+                        stop_event.set()
+                    _, pending = wait(pending, timeout=1, return_when=FIRST_EXCEPTION)
+
+                for future in futures:
+                    try:
+                        good, bad, shard_results = future.result()
+                    except Exception as err:
+                        logger.error(f"Процесс парсинга завершился с ошибкой: {err}")
+                        continue
+                    self.good_request_count += good
+                    self.bad_request_count += bad
+                    results.update(shard_results)
+
+        # воркеры писали в хранилище мимо кэша этого процесса
+        self.viewed_store.invalidate_cache()
+
+        if self.stop_event and self.stop_event.is_set():
+            return
+
+        for link_index, _, _ in links:
+            if link_index in results:
+                self.writer.submit(
+                    self._save_results,
+                    result_storage=self._storage_for_link(link_index=link_index),
+                    ads=results[link_index],
+                )
+
+    async def fetch_api_data_async(self, api_url: str, page: int) -> dict | None:
+        if self.stop_event and self.stop_event.is_set():
+            return None
+
+        page_url = self._api_url_for_page(api_url, page)
+        try:
+            response = await self.async_http.request("GET", page_url, endpoint=CATALOG_API)
+            self.good_request_count += 1
+            return self._read_catalog(api_url=api_url, raw=response.content)
+        except Exception as err:
+            self.bad_request_count += 1
+            logger.warning(f"Ошибка при запросе API {page_url}: {err}")
+            return None
+
+    async def _parse_async(self, links: list[tuple[int, str, str]]) -> None:
+        """Ссылки обходятся параллельно, страницы внутри ссылки - по порядку (см. page_concurrency)"""
+        self.async_http = self._build_async_http()
+        # фильтр, уведомления и запись в БД - синхронные, выполняем по одной странице
+        self._process_lock = asyncio.Lock()
+        try:
+            await asyncio.gather(*(
+                self._parse_link_async(
                     link_index=link_index,
+                    source_url=source_url,
+                    api_url=api_url,
                 )
+                for link_index, source_url, api_url in links
+            ))
+        finally:
+            await self.async_http.aclose()
+
+    def _build_async_http(self) -> AsyncHttpClient:
+        return AsyncHttpClient(
+            proxy=self.proxy,
+            cookies=self.cookies_provider,
+            timeout=self.config.timeout,
+            max_retries=self.config.max_count_of_retry,
+            retry_delay=self.config.retry_delay,
+            block_threshold=self.config.block_threshold,
+            backoff=self._build_backoff(),
+            pacer=self.pacer,
+            breakers=self.breakers,
+            on_request=self.request_hooks,
+            max_concurrency=self.config.max_concurrency,
+            max_concurrency_per_proxy=self.config.max_concurrency_per_proxy,
+        )
+
+    async def _parse_link_async(self, link_index: int, source_url: str, api_url: str) -> None:
+        result_storage = self._storage_for_link(link_index=link_index)
+        watermark = await asyncio.to_thread(self._get_watermark, source_url)
+        newest = watermark
+
+        ads_in_link = []
+        async with aclosing(self._iter_pages_async(api_url=api_url)) as pages:
+            async for page, json_data in pages:
+                logger.info(f"page={page} {source_url}")
+                if self.stop_event and self.stop_event.is_set():
+                    return
+
+                if not json_data:
+                    if self._catalog_unavailable():
+                        break
+                    logger.warning(
+                        f"Не удалось получить данные API для {source_url}, "
+                        f"повтор через {self.config.pause_between_links} сек."
+                    )
+                    await asyncio.sleep(self.config.pause_between_links)
+                    continue
+
+                async with self._process_lock:
+                    ads = await asyncio.to_thread(self._decode_page, json_data)
+                    if ads is None:
+                        continue
+
+                    if not ads:
+                        logger.info(
+                            "Объявления закончились, завершаю работу с данной ссылкой"
+                        )
+                        break
+
+                    ads_in_link.extend(await asyncio.to_thread(self._process_ads, ads))
+
+                marks = self._page_marks(ads=ads)
+                newest = self._newest_mark(newest, marks)
+                if self._reached_watermark(watermark, marks):
+                    logger.info("Дошли до уже просмотренных объявлений, завершаю работу с данной ссылкой")
+                    break
+
+                await asyncio.sleep(self._page_pause)
 
-            ads_in_link = []
+        if self.stop_event and self.stop_event.is_set():
+            return
+
+        # submit ждёт только при заполненной очереди записи
+        await asyncio.to_thread(self.writer.submit, self._save_results, result_storage, ads_in_link)
+        await asyncio.to_thread(self.writer.submit, self._save_watermark, source_url, newest, watermark)
+
+    async def _iter_pages_async(self, api_url: str):
+        """
+        Страницы ссылки (номер, ответ API) строго по порядку.
+        С page_concurrency > 1 следующие страницы загружаются заранее, не больше page_concurrency сразу,
+        в пределах тех же max_concurrency, max_concurrency_per_proxy и pacer. Новая загрузка начинается,
+        когда разобрана очередная страница, то есть после той же паузы между страницами.
+        Если ссылку бросили (объявления закончились, дошли до отметки, остановка), загрузки отменяются
+        """
+        window = max(1, self.config.page_concurrency)
+        pages = iter(range(1, self.config.count + 1))
+        in_flight: deque[tuple[int, asyncio.Task]] = deque()
+
+        def fill() -> None:
+            while len(in_flight) < window:
+                page = next(pages, None)
+                if page is None:
+                    return
+                task = asyncio.create_task(self.fetch_api_data_async(api_url=api_url, page=page))
+                in_flight.append((page, task))
+
+        try:
+            fill()
+            while in_flight:
+                page, task = in_flight.popleft()
+                json_data = await task
+                yield page, json_data
+                fill()
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in in_flight), return_exceptions=True)
+
+    def _parse_pipeline(self, links: list[tuple[int, str, str]]) -> None:
+        """
+        Загрузка страниц идёт дальше, пока предыдущие страницы проходят
+        валидацию, фильтры, уведомления и сохранение
+        """
+        self._pipeline_results.clear()
+
+        pipeline = Pipeline(
+            stages=[
+                ("validate", self._stage_validate),
+                ("filter", self._stage_filter),
+                ("notify", self._stage_notify),
+                ("enrich", self._stage_enrich),
+                ("persist", self._stage_persist),
+            ],
+            queue_size=self.config.pipeline_queue_size,
+            stop_event=self.stop_event,
+        )
+        pipeline.run(
+            producer=lambda put: self._produce_pages(links=links, put=put)
+        )
+
+    def _produce_pages(self, links: list[tuple[int, str, str]], put) -> None:
+        for link_index, source_url, api_url in links:
+            watermark = self._get_watermark(source_url=source_url)
+            newest = watermark
             for page in range(1, self.config.count + 1):
                 logger.info(f"page={page}")
                 if self.stop_event and self.stop_event.is_set():
@@ -167,6 +697,8 @@ class AvitoParse:
 
                 json_data = self.fetch_api_data(api_url=api_url, page=page)
                 if not json_data:
+                    if self._catalog_unavailable():
+                        break
                     logger.warning(
                         f"Не удалось получить данные API для {source_url}, "
                         f"повтор через {self.config.pause_between_links} сек."
@@ -174,54 +706,81 @@ class AvitoParse:
                     time.sleep(self.config.pause_between_links)
                     continue
 
-                catalog = self._extract_api_catalog(json_data)
-                try:
-                    ads_models = ItemsResponse(**catalog)
-                except ValidationError as err:
-                    logger.error(
-                        f"При валидации объявлений произошла ошибка: {err}"
-                    )
-                    continue
-
-                ads = self._clean_null_ads(ads=ads_models.items)
-                logger.info(f"Объявлений перед фильтрацией {len(ads)}")
-                ads = self._add_seller_to_ads(ads=ads)
-                ads = self._add_promotion_to_ads(ads=ads)
-
-                if not ads:
+                if not self._has_ads(json_data):
                     logger.info(
                         "Объявления закончились, завершаю работу с данной ссылкой"
                     )
                     break
 
-                filtered_ads = self.filter_ads(ads=ads)
-                self.notifier.notify_many(ads=filtered_ads)
-                filtered_ads = self.parse_views(ads=filtered_ads)
-                filtered_ads = self.parse_phone(ads=filtered_ads)
+                put(PageTask(
+                    link_index=link_index,
+                    source_url=source_url,
+                    page=page,
+                    payload=json_data,
+                ))
+
+                marks = self._raw_page_marks(catalog=json_data)
+                newest = self._newest_mark(newest, marks)
+                if self._reached_watermark(watermark, marks):
+                    logger.info("Дошли до уже просмотренных объявлений, завершаю работу с данной ссылкой")
+                    break
 
-                if filtered_ads:
-                    self.__save_viewed(ads=filtered_ads)
-                    ads_in_link.extend(filtered_ads)
+                time.sleep(self._page_pause)
 
-                logger.info(f"Пауза {self.config.pause_between_links} сек.")
-                time.sleep(self.config.pause_between_links)
+            put(PageTask(
+                link_index=link_index,
+                source_url=source_url,
+                link_done=True,
+                watermark=(watermark, newest),
+            ))
 
-            if ads_in_link:
-                logger.info(f"Сохраняю {len(ads_in_link)} объявлений")
-                self.result_storage.save(ads_in_link)
-            else:
-                logger.info("Сохранять нечего")
+    @staticmethod
+    def _has_ads(catalog: dict) -> bool:
+        items = catalog.get("items") or []
+        return any(isinstance(item, dict) and item.get("id") for item in items)
 
-        logger.info(
-            f"Хорошие запросы: {self.good_request_count}шт, "
-            f"плохие: {self.bad_request_count}шт"
-        )
+    def _stage_validate(self, task: PageTask) -> PageTask | None:
+        if task.payload is None:
+            return task
 
-        if self.config.one_time_start:
-            self.notifier.notify(
-                message="Парсинг Авито завершён. Все ссылки обработаны"
+        ads = self._decode_page(catalog=task.payload)
+        task.payload = None
+        if ads is None:
+            return None
+        task.ads = ads
+        return task
+
+    def _stage_filter(self, task: PageTask) -> PageTask:
+        if task.ads:
+            task.ads = self.viewed_claims.claim(self.filter_ads(ads=task.ads))
+        return task
+
+    def _stage_notify(self, task: PageTask) -> PageTask:
+        if task.ads:
+            self.notifier.notify_many(ads=task.ads)
+        return task
+
+    def _stage_enrich(self, task: PageTask) -> PageTask:
+        if task.ads:
+            task.ads = self.parse_views(ads=task.ads)
+            task.ads = self.parse_phone(ads=task.ads)
+        return task
+
+    def _stage_persist(self, task: PageTask) -> None:
+        results = self._pipeline_results.setdefault(task.link_index, [])
+        if task.ads:
+            self.writer.save_viewed(ads=task.ads)
+            results.extend(task.ads)
+
+        if task.link_done:
+            self.writer.submit(
+                self._save_results,
+                result_storage=self._storage_for_link(link_index=task.link_index),
+                ads=self._pipeline_results.pop(task.link_index),
             )
-            self.stop_event = True
+            previous, newest = task.watermark or (None, None)
+            self.writer.submit(self._save_watermark, source_url=task.source_url, mark=newest, previous=previous)
+
     @staticmethod
     def _clean_null_ads(ads: list[Item]) -> list[Item]:
         return [ad for ad in ads if ad.id]
@@ -251,32 +810,20 @@ class AvitoParse:
     def filter_ads(self, ads: list[Item]) -> list[Item]:
         return self.ads_filter.apply(ads)
 
-    def _add_seller_to_ads(self, ads: list[Item]) -> list[Item]:
-        for ad in ads:
-            if seller_id := self._extract_seller_slug(data=ad):
-                ad.sellerId = seller_id
-        return ads
-
-    @staticmethod
-    def _add_promotion_to_ads(ads: list[Item]) -> list[Item]:
-        for ad in ads:
-            ad.isPromotion = any(
-                v.get("title") == "Продвинуто"
-                for step in (ad.iva or {}).get("DateInfoStep", [])
-                for v in step.payload.get("vas", [])
-            )
-        return ads
-
     def parse_views(self, ads: list[Item]) -> list[Item]:
         if not self.config.parse_views:
             return ads
 
         logger.info("Начинаю парсинг просмотров")
+        breaker = self.breakers.get(ITEM_HTML)
 
         for ad in ads:
             try:
                 html_code_full_page = self.fetch_data(url=f"https://www.avito.ru{ad.urlPath}")
                 if not html_code_full_page:
+                    if breaker and breaker.is_open:
+                        logger.warning("Страницы объявлений недоступны, просмотры не парсим")
+                        break
                     continue
                 ad.total_views, ad.today_views = self._extract_views(html=html_code_full_page)
                 delay = random.uniform(0.1, 0.9)
@@ -310,16 +857,9 @@ class AvitoParse:
 
         return total, today
 
-    @staticmethod
-    def _extract_seller_slug(data):
-        match = re.search(r"/brands/([^/?#]+)", str(data))
-        if match:
-            return match.group(1)
-        return None
-
     def is_viewed(self, ad: Item) -> bool:
         """Проверяет, смотрели мы это или нет"""
-        return self.db_handler.record_exists(record_id=ad.id, price=ad.priceDetailed.value)
+        return self.viewed_store.record_exists(record_id=ad.id, price=ad.priceDetailed.value)
 
     @staticmethod
     def _is_recent(timestamp_ms: int, max_age_seconds: int) -> bool:
@@ -330,12 +870,75 @@ class AvitoParse:
     def __save_viewed(self, ads: list[Item]) -> None:
         """Сохраняет просмотренные объявления"""
         try:
-            self.db_handler.add_record_from_page(ads=ads)
+            self.viewed_store.add_record_from_page(ads=ads)
         except Exception as err:
             logger.info(f"При сохранении в БД ошибка {err}")
 
 
+def load_peer_viewed(config: AvitoConfig) -> None:
+    """Снимки просмотренных других узлов: один раз при запуске парсера, не в каждом цикле и воркере"""
+    if config.viewed_peer_snapshots:
+        load_peer_snapshots(build_viewed_store(config=config), config.viewed_peer_snapshots)
+
+
+def _shard_cookies_pool(config: AvitoConfig, worker_id: int, workers: int) -> dict:
+    """
+    Доля воркера в cookies_pool_budget: бюджет на цикл общий, а запас у каждого воркера свой.
+    Воркеру, которому не досталось ни одной покупки, запас не нужен
+    """
+    budget = config.cookies_pool_budget
+    if not config.cookies_pool_size or not budget:
+        return {}
+    share = budget // workers + (1 if worker_id < budget % workers else 0)
+    if not share:
+        return {"cookies_pool_size": 0}
+    return {"cookies_pool_budget": share}
+
+
+def _run_shard(
+        config: AvitoConfig,
+        links: list[tuple[int, str, str]],
+        worker_id: int,
+        workers: int,
+        stop_event,
+        claims: tuple,
+) -> tuple[int, int, dict[int, list[Item]]]:
+    """Точка входа процесса-воркера: парсит свою часть ссылок, результаты отдаёт родителю"""
+    # обслуживанием БД занимается основной процесс.
+    # Кэш просмотренных воркеру не нужен: процессы воркеров новые в каждом цикле, кэш пришлось бы
+    # строить заново, и он не видит записи соседних воркеров - проверка идёт запросом к БД
+    worker_config = replace(
+        config,
+        workers=1,
+        one_file_for_link=False,
+        one_time_start=False,
+        viewed_max_age_days=0,
+        viewed_max_rows=0,
+        viewed_cache=False,
+        **_shard_cookies_pool(config, worker_id=worker_id, workers=workers),
+    )
+    parser = AvitoParse(worker_config, stop_event=stop_event, worker_id=worker_id)
+    parser.viewed_claims = SharedViewedClaims(*claims)
+    parser.link_storages = {link_index: MemoryResultStorage() for link_index, _, _ in links}
+    try:
+        # writer не запущен - запись синхронная, результаты готовы сразу после обхода
+        parser._crawl(links=links)
+    finally:
+        # процесс воркера завершится, начатая фоновая покупка cookies не должна пропасть
+        if parser.cookies_provider is not None:
+            parser.cookies_provider.close()
+    results = {link_index: storage.pop() for link_index, storage in parser.link_storages.items()}
+
+    for line in parser.request_stats.summary():
+        logger.info(f"Воркер {worker_id}, запросы {line}")
+    if parser.cookies_provider is not None:
+        for line in parser.cookies_provider.summary():
+            logger.info(f"Воркер {worker_id}, cookies: {line}")
+    return parser.good_request_count, parser.bad_request_count, results
+
+
 if __name__ == "__main__":
+    setup_file_log()
     try:
         config = load_avito_config("config.toml")
     except Exception as err:
@@ -352,6 +955,7 @@ if __name__ == "__main__":
             "pause_between_links и pause_general, чтобы снизить риск блокировок."
         )
 
+    load_peer_viewed(config)
     while True:
         try:
             parser = AvitoParse(config)
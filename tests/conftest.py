@@ -0,0 +1,78 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlsplit
+
+import pytest
+
+# тесты запускаются из корня репозитория: python -m pytest tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+Reply = tuple[int, dict, str | bytes]
+
+
+class FakeServer:
+    """
+    Локальный HTTP-сервер для тестов. На путь - очередь ответов (последний повторяется)
+    или функция, которая строит ответ по пути. Работает и как HTTP-прокси: запрос
+    с полным URL разбирается так же
+    """
+
+    def __init__(self):
+        self.routes: dict[str, list[Reply] | Callable[[str], Reply]] = {}
+        self.hits: list[str] = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._reply(self)
+
+            do_POST = do_GET
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}"
+        threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    def route(self, path: str, *replies: Reply | Callable[[str], Reply]) -> None:
+        self.routes[path] = replies[0] if len(replies) == 1 and callable(replies[0]) else list(replies)
+
+    def _reply(self, handler: BaseHTTPRequestHandler) -> None:
+        path = urlsplit(handler.path).path
+        with self._lock:
+            self.hits.append(path)
+            route = self.routes.get(path)
+            if route is None:
+                reply = (404, {}, "")
+            elif callable(route):
+                reply = None
+            else:
+                reply = route.pop(0) if len(route) > 1 else route[0]
+        if reply is None:
+            reply = route(handler.path)
+
+        status, headers, body = reply
+        body = body.encode() if isinstance(body, str) else body
+        handler.send_response(status)
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def fake_server():
+    server = FakeServer()
+    yield server
+    server.close()
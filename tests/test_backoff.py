@@ -0,0 +1,221 @@
+"""Паузы между повторами (parser/http/backoff.py) и их применение в HttpClient на локальном сервере"""
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+import parser.http.client as client_module
+import parser_cls
+from dto import AvitoConfig
+from parser.http.backoff import BackoffPolicy, parse_retry_after
+from parser.http.client import HttpClient
+from parser.proxies.proxy import NoProxy
+
+
+def headers(**values):
+    return SimpleNamespace(headers={key.replace("_", "-"): value for key, value in values.items()})
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Паузы HttpClient: записываем вместо ожидания"""
+    recorded = []
+    monkeypatch.setattr(
+        client_module,
+        "time",
+        SimpleNamespace(sleep=recorded.append, perf_counter=time.perf_counter),
+    )
+    return recorded
+
+
+def make_client(**backoff) -> HttpClient:
+    policy = BackoffPolicy(rng=random.Random(1), **{"base": 1, "cap": 4, **backoff})
+    return HttpClient(proxy=NoProxy(), max_retries=5, block_threshold=100, backoff=policy)
+
+
+# ---- BackoffPolicy ----
+
+def test_fixed_strategy_always_waits_base():
+    policy = BackoffPolicy(base=5, cap=60, strategy="fixed")
+    assert [policy.next_delay(attempt) for attempt in range(1, 6)] == [5] * 5
+
+
+def test_exponential_strategy_is_full_jitter_under_cap():
+    policy = BackoffPolicy(base=1, cap=8, strategy="exponential", rng=random.Random(0))
+    for attempt in range(1, 10):
+        for _ in range(50):
+            assert 0 <= policy.next_delay(attempt) <= min(8, 2 ** (attempt - 1))
+
+
+def test_decorrelated_strategy_grows_from_previous_and_respects_cap():
+    policy = BackoffPolicy(base=1, cap=10, strategy="decorrelated", rng=random.Random(0))
+    previous = None
+    for attempt in range(1, 50):
+        delay = policy.next_delay(attempt, previous=previous)
+        assert 1 <= delay <= min(10, (previous or 1) * 3)
+        previous = delay
+
+
+def test_cap_below_base_is_raised_to_base():
+    assert BackoffPolicy(base=5, cap=1).cap == 5
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        BackoffPolicy(strategy="linear")
+
+
+def test_retry_after_raises_delay_up_to_its_cap():
+    policy = BackoffPolicy(base=1, cap=4, retry_after_cap=30, rng=random.Random(0))
+    assert policy.next_delay(1, retry_after=10) == 10
+    assert policy.next_delay(1, retry_after=1000) == 30
+    # короткий Retry-After не укорачивает обычную паузу
+    assert policy.next_delay(1, retry_after=0) >= 1
+
+
+def test_parse_retry_after_seconds_date_and_garbage():
+    assert parse_retry_after(headers(Retry_After="120")) == 120
+    moment = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert 55 <= parse_retry_after(headers(Retry_After=format_datetime(moment, usegmt=True))) <= 60
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert parse_retry_after(headers(Retry_After=format_datetime(past, usegmt=True))) == 0
+    assert parse_retry_after(headers(Retry_After="soon")) is None
+    assert parse_retry_after(headers()) is None
+    assert parse_retry_after(None) is None
+
+
+# ---- HttpClient на локальном сервере ----
+
+def test_429_with_retry_after_waits_what_server_asks(fake_server, sleeps):
+    fake_server.route("/page", (429, {"Retry-After": "7"}, ""), (200, {}, "ok"))
+
+    response = make_client().request("GET", f"{fake_server.url}/page")
+
+    assert response.text == "ok"
+    assert sleeps == [7]
+    assert fake_server.hits == ["/page", "/page"]
+
+
+def test_429_retry_after_is_capped(fake_server, sleeps):
+    fake_server.route("/page", (429, {"Retry-After": "100000"}, ""), (200, {}, "ok"))
+
+    make_client(retry_after_cap=300).request("GET", f"{fake_server.url}/page")
+
+    assert sleeps == [300]
+
+
+def test_429_without_retry_after_uses_jittered_backoff(fake_server, sleeps):
+    fake_server.route("/page", *[(429, {}, "")] * 4, (200, {}, "ok"))
+
+    make_client(base=1, cap=4).request("GET", f"{fake_server.url}/page")
+
+    assert len(sleeps) == 4
+    previous = 1
+    for delay in sleeps:
+        assert 1 <= delay <= min(4, previous * 3)
+        previous = delay
+
+
+def test_5xx_is_retried_with_backoff_and_honours_retry_after(fake_server, sleeps):
+    fake_server.route(
+        "/page",
+        (503, {}, "down"),
+        (503, {"Retry-After": "9"}, "down"),
+        (200, {}, "ok"),
+    )
+
+    response = make_client(base=1, cap=4).request("GET", f"{fake_server.url}/page")
+
+    assert response.text == "ok"
+    assert 1 <= sleeps[0] <= 3
+    assert sleeps[1] == 9
+
+
+def test_retries_end_after_max_retries(fake_server, sleeps):
+    fake_server.route("/page", (500, {}, "error"))
+
+    with pytest.raises(RuntimeError):
+        make_client().request("GET", f"{fake_server.url}/page")
+
+    # пауза между попытками, после последней не ждём
+    assert len(fake_server.hits) == 5
+    assert len(sleeps) == 4
+    assert all(1 <= delay <= 4 for delay in sleeps)
+
+
+def test_fixed_strategy_keeps_old_behaviour(fake_server, sleeps):
+    fake_server.route("/page", (429, {}, ""), (502, {}, ""), (200, {}, "ok"))
+
+    make_client(base=5, cap=60, strategy="fixed").request("GET", f"{fake_server.url}/page")
+
+    assert sleeps == [5, 5]
+
+
+# ---- fetch_data и parse_views ----
+
+VIEWS_HTML = """
+<div data-marker="item-view/total-views">1 234 просмотра</div>
+<div data-marker="item-view/today-views">+56 сегодня</div>
+"""
+
+
+@pytest.fixture
+def avito_parser(fake_server, sleeps, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    config = AvitoConfig(
+        urls=[],
+        parse_views=True,
+        viewed_backend="memory",
+        max_count_of_retry=3,
+        retry_delay=1,
+        retry_delay_max=4,
+        block_threshold=100,
+        breaker_failures=0,
+    )
+    avito = parser_cls.AvitoParse(config)
+    # страницы объявлений www.avito.ru отдаёт локальный сервер
+    session_request = avito.http._client.request
+    monkeypatch.setattr(
+        avito.http._client,
+        "request",
+        lambda method, url, **kwargs: session_request(
+            method, url.replace("https://www.avito.ru", fake_server.url), **kwargs
+        ),
+    )
+    # пауза между объявлениями в parse_views
+    monkeypatch.setattr(parser_cls, "time", SimpleNamespace(sleep=lambda delay: None, time=time.time))
+    return avito
+
+
+def test_fetch_data_retries_429_then_returns_page(avito_parser, fake_server, sleeps):
+    fake_server.route("/item", (429, {"Retry-After": "3"}, ""), (200, {}, "page"))
+
+    assert avito_parser.fetch_data("https://www.avito.ru/item") == "page"
+    assert sleeps == [3]
+    assert (avito_parser.good_request_count, avito_parser.bad_request_count) == (1, 0)
+
+
+def test_fetch_data_gives_up_after_retries(avito_parser, fake_server, sleeps):
+    fake_server.route("/item", (503, {}, ""))
+
+    assert avito_parser.fetch_data("https://www.avito.ru/item") is None
+    assert len(sleeps) == 2
+    assert (avito_parser.good_request_count, avito_parser.bad_request_count) == (0, 1)
+
+
+def test_parse_views_survives_blocks_and_errors(avito_parser, fake_server, sleeps):
+    fake_server.route("/ok", (429, {}, ""), (200, {}, VIEWS_HTML))
+    fake_server.route("/down", (500, {}, ""))
+    ads = [SimpleNamespace(urlPath="/ok", total_views=None, today_views=None),
+           SimpleNamespace(urlPath="/down", total_views=None, today_views=None)]
+
+    avito_parser.parse_views(ads)
+
+    assert (ads[0].total_views, ads[0].today_views) == (1234, 56)
+    assert (ads[1].total_views, ads[1].today_views) == (None, None)
+    # 429 у первого объявления и две ошибки 500 у второго - паузы по политике, не больше cap
+    assert len(sleeps) == 3
+    assert all(1 <= delay <= 4 for delay in sleeps)
@@ -0,0 +1,170 @@
+"""Смена IP мобильного прокси (parser/proxies/proxy.py) на локальных ссылке смены IP и сервисе IP"""
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import parser.proxies.proxy as proxy_module
+from parser.http.client import HttpClient
+from parser.proxies.proxy import MobileProxy
+
+
+class FakeOperator:
+    """Ссылка смены IP (/change) и сервис внешнего IP (/ip); сам fake_server служит прокси"""
+
+    def __init__(self, server, new_ip: str | None = "2.2.2.2", probes_until_switch: int = 2):
+        self.ip = "1.1.1.1"
+        self.new_ip = new_ip
+        self.probes_until_switch = probes_until_switch
+        self.release = threading.Event()
+        self.release.set()
+        self.changes = 0
+        server.route("/change", self.change)
+        server.route("/ip", self.probe)
+
+    def change(self, path):
+        self.release.wait(5)
+        self.changes += 1
+        return 200, {"Content-Type": "application/json"}, json.dumps({"new_ip": self.new_ip})
+
+    def probe(self, path):
+        # новый IP виден через прокси не сразу
+        if self.new_ip and self.probes_until_switch <= 0:
+            self.ip = self.new_ip
+        self.probes_until_switch -= 1
+        return 200, {}, self.ip
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    """Проверка IP раз в 0.05 сек. вместо секунды"""
+    monkeypatch.setattr(
+        proxy_module,
+        "time",
+        SimpleNamespace(monotonic=time.monotonic, sleep=lambda delay: time.sleep(0.05)),
+    )
+
+
+def make_proxy(server, **options) -> MobileProxy:
+    options = {"min_interval": 30, "rotate_timeout": 5, **options}
+    return MobileProxy(
+        url=server.url.removeprefix("http://"),
+        change_ip_url=f"{server.url}/change",
+        probe_url=f"{server.url}/ip",
+        **options,
+    )
+
+
+def test_new_ip_is_confirmed_through_probe(fake_server):
+    operator = FakeOperator(fake_server)
+    proxy = make_proxy(fake_server)
+
+    assert proxy.handle_block() is True
+    assert proxy.wait_ready() is True
+
+    assert proxy.confirmed is True
+    assert proxy.last_ip == "2.2.2.2"
+    assert not proxy.rotating
+    assert operator.changes == 1
+
+
+def test_change_without_reported_ip_is_confirmed_by_any_new_address(fake_server):
+    operator = FakeOperator(fake_server, new_ip=None)
+    proxy = make_proxy(fake_server, rotate_timeout=1)
+    threading.Timer(0.3, lambda: setattr(operator, "ip", "3.3.3.3")).start()
+
+    proxy.handle_block()
+    proxy.wait_ready()
+
+    assert proxy.confirmed is True
+    assert proxy.last_ip == "3.3.3.3"
+
+
+def test_requests_wait_while_ip_is_rotating(fake_server):
+    operator = FakeOperator(fake_server)
+    operator.release.clear()
+    fake_server.route("/page", (200, {}, "ok"))
+    proxy = make_proxy(fake_server)
+    client = HttpClient(proxy=proxy, max_retries=1)
+
+    proxy.handle_block()
+    assert proxy.rotating
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(response=client.request("GET", f"{fake_server.url}/page")))
+    worker.start()
+    time.sleep(0.3)
+
+    assert "/page" not in fake_server.hits
+    operator.release.set()
+    worker.join(5)
+
+    assert result["response"].text == "ok"
+    assert proxy.confirmed is True
+    # запрос ушёл только после подтверждения нового IP
+    hits = fake_server.hits
+    assert hits.index("/page") > len(hits) - 1 - hits[::-1].index("/ip")
+
+
+def test_timeout_reports_unconfirmed_rotation(fake_server):
+    FakeOperator(fake_server, probes_until_switch=10 ** 6)
+    proxy = make_proxy(fake_server, rotate_timeout=0.5)
+
+    started = time.monotonic()
+    proxy.handle_block()
+    assert proxy.wait_ready(timeout=5) is True
+
+    assert proxy.confirmed is False
+    assert proxy.last_ip is None
+    assert time.monotonic() - started < 3
+
+
+def test_failed_change_request_reports_unconfirmed_rotation(fake_server):
+    fake_server.route("/change", (500, {}, "error"))
+    fake_server.route("/ip", (200, {}, "1.1.1.1"))
+    proxy = make_proxy(fake_server)
+
+    proxy.handle_block()
+    proxy.wait_ready()
+
+    assert proxy.confirmed is False
+
+
+def test_min_interval_limits_second_rotation(fake_server):
+    operator = FakeOperator(fake_server)
+    proxy = make_proxy(fake_server, min_interval=30)
+    proxy.handle_block()
+    proxy.wait_ready()
+
+    assert proxy.handle_block() is False
+    assert not proxy.rotating
+    assert operator.changes == 1
+
+
+def test_block_during_rotation_does_not_start_another(fake_server):
+    operator = FakeOperator(fake_server)
+    operator.release.clear()
+    proxy = make_proxy(fake_server, min_interval=0)
+
+    assert proxy.handle_block() is True
+    assert proxy.handle_block() is True
+    operator.release.set()
+    proxy.wait_ready()
+
+    assert operator.changes == 1
+
+
+def test_rotation_allowed_again_after_min_interval(fake_server):
+    operator = FakeOperator(fake_server)
+    proxy = make_proxy(fake_server, min_interval=0.2)
+    proxy.handle_block()
+    proxy.wait_ready()
+    time.sleep(0.3)
+    operator.new_ip, operator.probes_until_switch = "4.4.4.4", 0
+
+    assert proxy.handle_block() is True
+    proxy.wait_ready()
+
+    assert operator.changes == 2
+    assert proxy.last_ip == "4.4.4.4"
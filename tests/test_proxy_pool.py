@@ -0,0 +1,107 @@
+"""Выбор прокси в ProxyPool (parser/proxies/pool.py) по статистике запросов"""
+from dto import AvitoConfig
+from parser.http.tracing import RequestEvent
+from parser.proxies.pool import ProxyPool
+from parser.proxies.proxy import ServerProxy
+from parser.proxies.proxy_factory import build_proxy
+
+PROXY_A = "user:pass@10.0.0.1:8000"
+PROXY_B = "user:pass@10.0.0.2:8000"
+PROXY_C = "user:pass@10.0.0.3:8000"
+
+
+def make_pool(*proxies: str, block_threshold: int = 100) -> ProxyPool:
+    return ProxyPool([ServerProxy(proxy) for proxy in proxies], block_threshold=block_threshold, timeout=20)
+
+
+def event(proxy: str, status: int | None, latency: float) -> RequestEvent:
+    return RequestEvent(
+        method="GET", endpoint=None, url="https://www.avito.ru/", status=status,
+        bytes=0, latency=latency, attempt=1, proxy=proxy.rsplit("@", 1)[1],
+        proxy_url=ServerProxy(proxy).get_httpx_proxy(),
+    )
+
+
+def chosen(pool: ProxyPool) -> str:
+    return pool.get_httpx_proxy().rsplit("@", 1)[1]
+
+
+def test_proxy_that_only_times_out_loses_to_healthy_one():
+    pool = make_pool(PROXY_A, PROXY_B)
+    for _ in range(50):
+        pool.observe(event(PROXY_A, None, 20.0))
+        pool.observe(event(PROXY_B, 200, 0.2))
+
+    assert chosen(pool) == "10.0.0.2:8000"
+
+
+def test_proxy_that_refuses_connections_instantly_loses_to_healthy_one():
+    pool = make_pool(PROXY_A, PROXY_B)
+    for _ in range(50):
+        pool.observe(event(PROXY_A, None, 0.001))
+        pool.observe(event(PROXY_B, 200, 0.5))
+
+    assert chosen(pool) == "10.0.0.2:8000"
+
+
+def test_fastest_healthy_proxy_wins():
+    pool = make_pool(PROXY_A, PROXY_B)
+    for _ in range(10):
+        pool.observe(event(PROXY_A, 200, 0.8))
+        pool.observe(event(PROXY_B, 200, 0.3))
+
+    assert chosen(pool) == "10.0.0.2:8000"
+
+
+def test_untried_proxy_competes_with_pool_median():
+    pool = make_pool(PROXY_A, PROXY_B, PROXY_C)
+    for _ in range(10):
+        pool.observe(event(PROXY_A, 200, 0.2))
+        pool.observe(event(PROXY_B, None, 20.0))
+
+    # у C нет статистики: медиана пула хуже быстрого A, но лучше отказывающего B
+    assert chosen(pool) == "10.0.0.1:8000"
+    default = pool._median_latency()
+    entries = {entry.label: entry for entry in pool._entries}
+    assert entries["10.0.0.3:8000"].score(default) < entries["10.0.0.2:8000"].score(default)
+
+
+def test_failures_in_row_put_proxy_on_cooldown():
+    pool = make_pool(PROXY_A, PROXY_B, block_threshold=3)
+    pool.observe(event(PROXY_B, 200, 1.0))
+    for _ in range(3):
+        pool.observe(event(PROXY_A, 502, 0.1))
+
+    entries = {entry.label: entry for entry in pool._entries}
+    assert entries["10.0.0.1:8000"].cooldown_until > 0
+    assert chosen(pool) == "10.0.0.2:8000"
+
+
+def test_blocks_in_row_put_proxy_on_cooldown():
+    pool = make_pool(PROXY_A, PROXY_B, block_threshold=2)
+    pool.observe(event(PROXY_B, 200, 1.0))
+    pool.observe(event(PROXY_A, 429, 0.1))
+    pool.observe(event(PROXY_A, 429, 0.1))
+
+    assert chosen(pool) == "10.0.0.2:8000"
+
+
+def test_build_proxy_keeps_one_pool_per_process():
+    config = AvitoConfig(urls=[], proxy_pool=[PROXY_A, PROXY_B])
+    pool = build_proxy(config)
+    pool.observe(event(PROXY_A, None, 20.0))
+
+    assert build_proxy(AvitoConfig(urls=[], proxy_pool=[PROXY_A, PROXY_B])) is pool
+    assert build_proxy(AvitoConfig(urls=[], proxy_pool=[PROXY_A])) is not pool
+
+
+def test_same_host_with_different_logins_is_tracked_separately():
+    session_1 = "session-1:pass@10.0.0.9:7000"
+    session_2 = "session-2:pass@10.0.0.9:7000"
+    pool = make_pool(session_1, session_2, session_1, block_threshold=2)
+    pool.observe(event(session_1, 429, 0.1))
+    pool.observe(event(session_1, 429, 0.1))
+
+    assert len(pool._entries) == 2
+    assert pool.get_httpx_proxy() == ServerProxy(session_2).get_httpx_proxy()
+    assert [entry.label for entry in pool._entries] == ["session-1@10.0.0.9:7000", "session-2@10.0.0.9:7000"]
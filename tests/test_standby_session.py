@@ -0,0 +1,68 @@
+"""Запасная сессия HttpClient (parser/http/client.py): готовится с первой блокировки, ошибка не роняет запрос"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import parser.http.client as client_module
+from parser.cookies.base import CookiesProvider
+from parser.http.breaker import CircuitOpenError
+from parser.http.client import HttpClient
+from parser.proxies.proxy import NoProxy
+
+
+class CountingCookies(CookiesProvider):
+    def __init__(self, fail: bool = False):
+        self.version = 0
+        self.fail = fail
+
+    def get(self):
+        return {"v": str(self.version)}
+
+    def handle_block(self):
+        if self.fail:
+            raise CircuitOpenError("cookies api недоступен")
+        self.version += 1
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(
+        client_module,
+        "time",
+        SimpleNamespace(sleep=lambda delay: None, perf_counter=time.perf_counter),
+    )
+
+
+def test_standby_is_prepared_on_first_block_and_swapped_at_threshold(fake_server):
+    fake_server.route("/page", (403, {}, ""), (403, {}, ""), (200, {}, "ok"))
+    cookies = CountingCookies()
+    client = HttpClient(proxy=NoProxy(), cookies=cookies, max_retries=5, block_threshold=2)
+
+    first_block_seen = []
+    original_prepare = client._prepare_standby
+
+    def prepare():
+        first_block_seen.append(client._block_attempts)
+        original_prepare()
+
+    client._prepare_standby = prepare
+    response = client.request("GET", f"{fake_server.url}/page")
+
+    assert response.text == "ok"
+    assert first_block_seen[0] == 1
+    assert cookies.version == 1
+    assert client._client.cookies.get("v") == "1"
+    assert client._standby is None
+
+
+def test_failed_standby_keeps_current_session(fake_server):
+    fake_server.route("/page", (403, {}, ""), (200, {}, "ok"))
+    client = HttpClient(proxy=NoProxy(), cookies=CountingCookies(fail=True), max_retries=5, block_threshold=1)
+    session = client._client
+
+    response = client.request("GET", f"{fake_server.url}/page")
+
+    assert response.text == "ok"
+    assert client._client is session
+    assert client._client.cookies.get("v") == "0"
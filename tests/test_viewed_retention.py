@@ -0,0 +1,39 @@
+"""ViewedRetention (db_service.py): подсчёт записей для max_rows и остановка потока"""
+import time
+
+from db_service import SQLiteDBHandler
+
+
+def test_row_count_adds_only_new_rows(tmp_path, monkeypatch):
+    handler = SQLiteDBHandler(db_name=str(tmp_path / "db.db"), use_cache=False, retention_rows=1_000)
+    retention = handler._retention
+    retention.stop()
+    conn = handler._connection()
+    handler.add_pairs([(ad_id, 100) for ad_id in range(10)])
+
+    clock = [time.time() + 1]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    assert retention._row_count(conn) == 10
+
+    clock[0] += 2
+    handler.add_pairs([(ad_id, 100) for ad_id in range(5, 15)])  # 5 уже были - обновится только last_seen
+    clock[0] += 2
+    queries = []
+    conn.set_trace_callback(queries.append)
+    assert retention._row_count(conn) == 15
+    conn.set_trace_callback(None)
+    assert all("last_seen >=" in query for query in queries if "COUNT" in query)
+    handler.close()
+
+
+def test_stop_and_restart(tmp_path):
+    handler = SQLiteDBHandler(db_name=str(tmp_path / "db.db"), use_cache=False, retention_days=30)
+    handler.set_busy(True)
+    handler.set_busy(False)
+    handler.stop_maintenance()
+    assert handler._retention._thread is None
+
+    handler.set_busy(True)
+    assert handler._retention._thread.is_alive()
+    handler.stop_maintenance()
+    handler.close()
@@ -0,0 +1,75 @@
+"""Запас cookies (parser/cookies/warm_pool.py): бюджет, остановка и доля бюджета воркера"""
+import threading
+
+from dto import AvitoConfig
+from parser.cookies.external_api import ExternalApiCookiesProvider
+from parser.cookies.warm_pool import WarmCookiePool
+from parser_cls import _shard_cookies_pool
+
+
+class SlowPurchase:
+    """Покупка, которая ждёт release, пока тест её не отпустит"""
+
+    def __init__(self, fail: bool = False):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+        self.fail = fail
+
+    def __call__(self) -> dict:
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("сервис недоступен")
+        return {"id": f"c{self.calls}", "cookies": {"a": "1"}, "purchased_at": 4102444800}
+
+
+def test_stop_waits_for_purchase_in_flight(tmp_path):
+    pool = WarmCookiePool(tmp_path / "pool.json", size=3, budget=1)
+    purchase = SlowPurchase()
+    pool.start_cycle(purchase)
+    assert purchase.started.wait(5)
+
+    threading.Timer(0.2, purchase.release.set).start()
+    pool.stop()
+
+    assert len(pool) == 1
+    assert pool.cycle_purchases == 1
+    assert purchase.calls == 1
+    assert WarmCookiePool(tmp_path / "pool.json", size=3)._sets[0]["id"] == "c1"
+
+
+def test_failed_purchase_is_not_counted_and_stop_interrupts_pause(tmp_path):
+    pool = WarmCookiePool(tmp_path / "pool.json", size=3)
+    purchase = SlowPurchase(fail=True)
+    purchase.release.set()
+    pool.start_cycle(purchase)
+    assert purchase.started.wait(5)
+
+    pool.stop()  # пауза после ошибки - REFILL_PAUSE, но остановка её не ждёт
+
+    assert pool.cycle_purchases == 0
+    assert len(pool) == 0
+
+
+def test_budget_is_split_between_workers():
+    config = AvitoConfig(urls=[], cookies_pool_size=2, cookies_pool_budget=5)
+
+    shares = [_shard_cookies_pool(config, worker_id=worker_id, workers=3) for worker_id in range(3)]
+    assert shares == [{"cookies_pool_budget": 2}, {"cookies_pool_budget": 2}, {"cookies_pool_budget": 1}]
+
+    config = AvitoConfig(urls=[], cookies_pool_size=2, cookies_pool_budget=1)
+    assert _shard_cookies_pool(config, worker_id=1, workers=2) == {"cookies_pool_size": 0}
+    assert _shard_cookies_pool(AvitoConfig(urls=[], cookies_pool_size=2, cookies_pool_budget=0), 1, 2) == {}
+
+
+def test_cookies_from_pool_keep_their_purchase_time(tmp_path):
+    config = AvitoConfig(urls=[], use_bypass_api=True, cookies_pool_size=2)
+    provider = ExternalApiCookiesProvider(config, storage_path=tmp_path / "cookies.json")
+    provider._apply({
+        "id": "c1", "cookies": {"a": "1"}, "fingerprint": {}, "mobile": True, "user_agent": "UA",
+        "purchased_at": 1_000.0,
+    })
+
+    assert provider.last_purchase_at == 1_000.0
@@ -0,0 +1,256 @@
+"""Гарантии WriteBehind (parser/writer.py): порядок, объединение страниц, flush/close и потери при падении"""
+import subprocess
+import sys
+import textwrap
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from db_service import SQLiteDBHandler
+from parser.http.tracing import LatencyStats
+from parser.writer import WriteBehind
+from parser_cls import AvitoParse
+
+
+def make_ad(ad_id: int, price: int = 100):
+    return SimpleNamespace(id=ad_id, priceDetailed=SimpleNamespace(value=price))
+
+
+def page(start: int, size: int = 5) -> list:
+    return [make_ad(ad_id) for ad_id in range(start, start + size)]
+
+
+class RecordingWriter:
+    """write_viewed, который запоминает каждый вызов (= одну транзакцию в БД)"""
+
+    def __init__(self, delay: threading.Event | None = None):
+        self.calls: list[list[int]] = []
+        self.delay = delay
+
+    def __call__(self, ads: list) -> None:
+        if self.delay is not None:
+            self.delay.wait(5)
+        self.calls.append([ad.id for ad in ads])
+
+
+@pytest.fixture
+def gate():
+    """Задание, которое держит поток записи, пока тест не откроет gate"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def hold(writer: WriteBehind, gate: threading.Event) -> None:
+    """Занимает поток записи до открытия gate и ждёт, пока он возьмёт задание"""
+    entered = threading.Event()
+
+    def wait():
+        entered.set()
+        gate.wait(5)
+
+    writer.submit(wait)
+    entered.wait(5)
+
+
+def test_pages_queued_during_write_are_coalesced_into_one_transaction(gate):
+    write_viewed = RecordingWriter()
+    writer = WriteBehind(write_viewed=write_viewed, queue_size=64)
+    writer.start()
+
+    hold(writer, gate)
+    for start in range(0, 50, 5):
+        writer.save_viewed(page(start))
+    gate.set()
+    writer.flush()
+
+    assert write_viewed.calls == [list(range(50))]
+    writer.close()
+
+
+def test_coalesced_pages_land_in_sqlite_in_one_commit(tmp_path, gate):
+    store = SQLiteDBHandler(db_name=str(tmp_path / "viewed.db"), use_cache=False)
+    commits = []
+
+    def write_viewed(ads):
+        # подключение у потока записи своё
+        store._connection().set_trace_callback(lambda sql: sql == "COMMIT" and commits.append(sql))
+        store.add_record_from_page(ads)
+
+    writer = WriteBehind(write_viewed=write_viewed, queue_size=64)
+    writer.start()
+
+    hold(writer, gate)
+    pages = [page(start) for start in range(0, 20, 5)]
+    for ads in pages:
+        writer.save_viewed(ads)
+    gate.set()
+    writer.close()
+
+    assert len(commits) == 1
+    assert store.filter_unseen([(ad.id, 100) for ads in pages for ad in ads]) == []
+    store.close()
+
+
+def test_jobs_run_after_viewed_sent_before_them():
+    order = []
+    writer = WriteBehind(write_viewed=lambda ads: order.append(("viewed", len(ads))), queue_size=64)
+    writer.start()
+
+    writer.save_viewed(page(0))
+    writer.submit(order.append, ("job", 1))
+    writer.save_viewed(page(5))
+    writer.close()
+
+    assert order == [("viewed", 5), ("job", 1), ("viewed", 5)]
+
+
+def test_flush_waits_for_everything_sent():
+    release = threading.Event()
+    write_viewed = RecordingWriter(delay=release)
+    writer = WriteBehind(write_viewed=write_viewed, queue_size=64)
+    writer.start()
+    writer.save_viewed(page(0))
+
+    threading.Timer(0.2, release.set).start()
+    writer.flush()
+
+    assert write_viewed.calls == [list(range(5))]
+    writer.close()
+
+
+def test_close_writes_queue_and_stops_thread(gate):
+    write_viewed = RecordingWriter()
+    writer = WriteBehind(write_viewed=write_viewed, queue_size=64)
+    writer.start()
+    writer.submit(gate.wait, 5)
+    writer.save_viewed(page(0))
+    threading.Timer(0.2, gate.set).start()
+
+    writer.close()
+
+    assert write_viewed.calls == [list(range(5))]
+    assert not writer._running()
+    # после close запись снова синхронная
+    writer.save_viewed(page(5))
+    assert write_viewed.calls[-1] == list(range(5, 10))
+
+
+def test_queue_size_zero_writes_in_caller_thread():
+    write_viewed = RecordingWriter()
+    writer = WriteBehind(write_viewed=write_viewed, queue_size=0)
+    writer.start()
+
+    writer.save_viewed(page(0))
+
+    assert write_viewed.calls == [list(range(5))]
+    assert writer._thread is None
+
+
+def test_writer_error_does_not_stop_thread():
+    calls = []
+
+    def write_viewed(ads):
+        calls.append(len(ads))
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+
+    writer = WriteBehind(write_viewed=write_viewed, queue_size=64)
+    writer.start()
+    writer.save_viewed(page(0))
+    writer.flush()
+    writer.save_viewed(page(5))
+    writer.close()
+
+    assert calls == [5, 5]
+
+
+def _parser_stub(writer: WriteBehind, events: list) -> SimpleNamespace:
+    return SimpleNamespace(
+        writer=writer,
+        _notify_price_drops=lambda: events.append("notify"),
+        good_request_count=0,
+        bad_request_count=0,
+        pacer=None,
+        request_stats=LatencyStats(),
+        proxy=SimpleNamespace(summary=lambda: []),
+        cookies_provider=None,
+        config=SimpleNamespace(one_time_start=False),
+        _last_cycle=lambda: False,
+        viewed_store=SimpleNamespace(set_busy=lambda busy: None, close=lambda: events.append("store closed")),
+        price_history=None,
+    )
+
+
+def test_finish_flushes_before_notifications(gate):
+    events = []
+    writer = WriteBehind(write_viewed=lambda ads: events.append("viewed"), queue_size=64)
+    writer.start()
+    writer.submit(gate.wait, 5)
+    writer.save_viewed(page(0))
+    threading.Timer(0.2, gate.set).start()
+
+    AvitoParse._finish(_parser_stub(writer, events))
+
+    assert events == ["viewed", "notify"]
+    writer.close()
+
+
+def test_parse_closes_writer_on_error(gate):
+    events = []
+    writer = WriteBehind(write_viewed=lambda ads: events.append("viewed"), queue_size=64)
+    parser = _parser_stub(writer, events)
+
+    def failing_cycle():
+        writer.submit(gate.wait, 5)
+        writer.save_viewed(page(0))
+        threading.Timer(0.2, gate.set).start()
+        raise RuntimeError("stop")
+
+    parser._parse_cycle = failing_cycle
+    with pytest.raises(RuntimeError):
+        AvitoParse.parse(parser)
+
+    assert events == ["viewed", "store closed"]
+    assert not writer._running()
+
+
+KILLED_PROCESS = textwrap.dedent(
+    """
+    import os, signal, sys, threading
+    from types import SimpleNamespace
+    sys.path.insert(0, {root!r})
+    from db_service import SQLiteDBHandler
+    from parser.writer import WriteBehind
+
+    def page(start):
+        return [SimpleNamespace(id=i, priceDetailed=SimpleNamespace(value=100)) for i in range(start, start + 5)]
+
+    store = SQLiteDBHandler(db_name={db!r}, use_cache=False)
+    writer = WriteBehind(write_viewed=store.add_record_from_page, queue_size=64)
+    writer.start()
+    writer.save_viewed(page(0))
+    writer.flush()
+    # запись занята, следующая страница остаётся в очереди
+    writer.submit(threading.Event().wait)
+    writer.save_viewed(page(5))
+    if hasattr(signal, "SIGKILL"):
+        os.kill(os.getpid(), signal.SIGKILL)
+    os._exit(1)
+    """
+)
+
+
+def test_kill_before_flush_loses_only_queued_pages(tmp_path):
+    db = str(tmp_path / "viewed.db")
+    root = str(Path(__file__).resolve().parent.parent)
+    subprocess.run([sys.executable, "-c", KILLED_PROCESS.format(root=root, db=db)], timeout=60)
+
+    store = SQLiteDBHandler(db_name=db, use_cache=False)
+    first, queued = [(i, 100) for i in range(5)], [(i, 100) for i in range(5, 10)]
+    # записанное до flush пережило падение, страница из очереди - нет и придёт в следующем цикле снова
+    assert store.filter_unseen(first) == []
+    assert store.filter_unseen(queued) == queued
+    store.close()
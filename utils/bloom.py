@@ -0,0 +1,100 @@
+"""
+Фильтр Блума для быстрой проверки "точно не видели".
+Блочный вариант: все биты ключа лежат в одном 64-битном слове, маска собирается
+из двух заранее посчитанных таблиц - на ключ несколько операций, это важно
+для загрузки миллионов записей при старте.
+"""
+import math
+import random
+import threading
+from array import array
+from functools import lru_cache
+
+_MASK64 = (1 << 64) - 1
+_MIX = 0x9E3779B97F4A7C15
+_TABLE_BITS = 16
+# блочный фильтр ошибается чаще классического, поэтому берём битов с запасом
+_BLOCKED_OVERHEAD = 1.5
+
+
+@lru_cache(maxsize=None)
+def _mask_table(bits_per_mask: int, seed: int) -> tuple[int, ...]:
+    rnd = random.Random(seed)
+    table = []
+    for _ in range(1 << _TABLE_BITS):
+        mask = 0
+        for position in rnd.sample(range(64), bits_per_mask):
+            mask |= 1 << position
+        table.append(mask)
+    return tuple(table)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float = 0.01, max_bytes: int | None = None):
+        capacity = max(1, capacity)
+        fp_rate = min(max(fp_rate, 1e-6), 0.5)
+        bits = math.ceil(
+            -capacity * math.log(fp_rate) / (math.log(2) ** 2) * _BLOCKED_OVERHEAD
+        )
+        if max_bytes:
+            bits = min(bits, max_bytes * 8)
+        self.words = max(1, bits // 64)
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.count = 0
+        # число бит на ключ, делится между двумя таблицами
+        hashes = max(2, min(16, round(-math.log2(fp_rate))))
+        self.hashes = hashes + hashes % 2
+        self._low = _mask_table(self.hashes // 2, 1)
+        self._high = _mask_table(self.hashes // 2, 2)
+        self._bits = array("Q", bytes(self.words * 8))
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self.words * 8
+
+    def _locate(self, key) -> tuple[int, int]:
+        h = hash(key)
+        g = (h * _MIX) & _MASK64
+        return (
+            h % self.words,
+            self._low[g >> 48] | self._high[(g >> 32) & 0xFFFF],
+        )
+
+    def add(self, key) -> None:
+        word, mask = self._locate(key)
+        with self._lock:
+            self._bits[word] |= mask
+            self.count += 1
+
+    def update(self, keys) -> None:
+        words = self.words
+        low, high = self._low, self._high
+        bits = self._bits
+        added = 0
+        with self._lock:
+            for key in keys:
+                h = hash(key)
+                g = (h * _MIX) & _MASK64
+                bits[h % words] |= low[g >> 48] | high[(g >> 32) & 0xFFFF]
+                added += 1
+            self.count += added
+
+    def maybe_contains(self, keys) -> list:
+        """Ключи, которые могут быть в фильтре (остальных там точно нет)"""
+        words = self.words
+        low, high = self._low, self._high
+        bits = self._bits
+        result = []
+        for key in keys:
+            h = hash(key)
+            g = (h * _MIX) & _MASK64
+            mask = low[g >> 48] | high[(g >> 32) & 0xFFFF]
+            if bits[h % words] & mask == mask:
+                result.append(key)
+        return result
+
+    def __contains__(self, key) -> bool:
+        word, mask = self._locate(key)
+        return self._bits[word] & mask == mask
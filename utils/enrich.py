@@ -0,0 +1,71 @@
+"""
+Вычисляемые поля объявления. Считаются один раз после валидации страницы,
+дальше фильтры, уведомления и сохранение читают готовые значения.
+
+Продавец ищется по порядку:
+1) userLogo.link - /brands/<slug> (магазин) или /user/<id>/... (частное лицо)
+2) payload шагов iva (componentData.payload и payload) - первая ссылка /brands/ или /user/
+Если ничего не нашли - продавец неизвестен.
+"""
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from loguru import logger
+
+from models import Item
+from utils.seller import seller_from_link, seller_from_payload
+
+PROMOTION_TITLE = "Продвинуто"
+
+
+@lru_cache(maxsize=256)
+def _image_area(size: str) -> int:
+    """"640x480" -> площадь, размеров у Авито немного, поэтому кэш"""
+    width, height = size.split("x")
+    return int(width) * int(height)
+
+
+def largest_image_url(image) -> str:
+    """image - Image у Item или dict размер -> ссылка у LazyItem"""
+    sizes = getattr(image, "root", image)
+    try:
+        best_key = max(sizes, key=_image_area)
+        return str(sizes[best_key])
+    except Exception as err:
+        logger.error(f"При определении лучшего изображения ошибка: {err}")
+        return ""
+
+
+def enrich_ad(ad: Item) -> Item:
+    user_logo = ad.userLogo
+    seller = seller_from_link(user_logo.link) if user_logo is not None else None
+    is_promotion = False
+
+    # один проход по iva: и продвижение, и продавец
+    for step_name, steps in (ad.iva or {}).items():
+        for step in steps:
+            if step_name == "DateInfoStep" and not is_promotion:
+                is_promotion = any(
+                    vas.get("title") == PROMOTION_TITLE
+                    for vas in (step.payload or {}).get("vas", [])
+                )
+            if seller is None:
+                seller = (
+                    seller_from_payload(step.componentData.payload)
+                    or seller_from_payload(step.payload)
+                )
+
+    ad.isPromotion = is_promotion
+    if seller:
+        ad.sellerId = seller.seller_id
+        ad.sellerType = seller.seller_type
+        ad.shopSlug = seller.shop_slug
+    ad.isReserved = bool(ad.isReserved)
+    ad.largestImageUrls = [largest_image_url(image) for image in ad.images or []]
+    if ad.sortTimeStamp:
+        ad.publishedAt = datetime.fromtimestamp(ad.sortTimeStamp / 1000, tz=timezone.utc)
+    return ad
+
+
+def enrich_ads(ads: list[Item]) -> list[Item]:
+    return [enrich_ad(ad) for ad in ads]
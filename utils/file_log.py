@@ -0,0 +1,15 @@
+from loguru import logger
+
+LOG_PATH = "logs/app.log"
+
+_sink_id: int | None = None
+
+
+def setup_file_log() -> None:
+    """
+    Лог в logs/app.log. Вызывается только из точек входа основного процесса: воркеры (spawn) импортируют
+    модули заново, а ротация loguru одного файла из нескольких процессов портит лог
+    """
+    global _sink_id
+    if _sink_id is None:
+        _sink_id = logger.add(LOG_PATH, rotation="5 MB", retention="5 days", level="DEBUG")
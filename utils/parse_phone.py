@@ -6,6 +6,7 @@ from loguru import logger
 from dto import AvitoConfig
 from integrations.notifications.transport import send_with_retries
 from models import Item
+from parser.http.breaker import SPFA_PHONE, build_breakers
 
 
 class ParsePhone:
@@ -16,7 +17,7 @@ class ParsePhone:
     def __init__(self, ads: list[Item], config: AvitoConfig):
         self.ads = ads
         self.config = config
-
+        self.breaker = build_breakers(config).get(SPFA_PHONE)
 
     def get_phone_batch(self, ads_ids: list):
         def _send():
@@ -29,7 +30,20 @@ class ParsePhone:
                 timeout=self.DEFAULT_TIMEOUT,
             )
 
-        return send_with_retries(_send)
+        if self.breaker is None:
+            return send_with_retries(_send)
+
+        self.breaker.allow()
+        try:
+            response = send_with_retries(_send)
+        except requests.HTTPError as err:
+            self.breaker.record_status(err.response.status_code if err.response is not None else None)
+            raise
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_status(response.status_code)
+        return response
 
     @staticmethod
     def get_phone_dict(response: dict) -> dict:
@@ -5,7 +5,7 @@ from loguru import logger
 from playwright_setup import ensure_playwright_installed
 from pathlib import Path
 
-logger.add("logs/app.log", rotation="5 MB", retention="5 days", level="DEBUG")
+from utils.file_log import setup_file_log
 
 PLAYWRIGHT_STATE_FILE = "storage/own_cookies.json"
 
@@ -204,4 +204,5 @@ async def wrapper():
 
 
 if __name__ == "__main__":
+    setup_file_log()
     asyncio.run(wrapper())
\ No newline at end of file
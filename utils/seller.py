@@ -0,0 +1,42 @@
+"""
+Определение продавца объявления по ссылкам /brands/<slug> (магазин) и /user/<id> (частное лицо)
+"""
+import re
+from typing import Any, Iterator
+
+from dto import SellerInfo
+
+_BRAND_RE = re.compile(r"/brands/([^/?#\s\"']+)")
+_USER_RE = re.compile(r"/user/([^/?#\s\"']+)")
+
+
+def seller_from_link(link: Any) -> SellerInfo | None:
+    if not isinstance(link, str):
+        return None
+    if match := _BRAND_RE.search(link):
+        slug = match.group(1)
+        return SellerInfo(seller_id=slug, seller_type="shop", shop_slug=slug)
+    if match := _USER_RE.search(link):
+        return SellerInfo(seller_id=match.group(1), seller_type="private")
+    return None
+
+
+def _iter_strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_strings(item)
+
+
+def seller_from_payload(payload: Any) -> SellerInfo | None:
+    """Первая ссылка на продавца среди строк payload"""
+    for text in _iter_strings(payload):
+        if "/brands/" not in text and "/user/" not in text:
+            continue
+        if seller := seller_from_link(text):
+            return seller
+    return None
@@ -0,0 +1,60 @@
+"""
+Снимки просмотренных объявлений для нескольких узлов (контейнеров) со своими database.db
+
+    python viewed_snapshot.py export node1.snap                  # выгрузить хранилище из config.toml
+    python viewed_snapshot.py merge node2.snap node3.snap        # добавить в хранилище чужие просмотренные
+    python viewed_snapshot.py merge node1.snap node2.snap -o all.snap  # объединить снимки в один файл
+"""
+import argparse
+import time
+
+from loguru import logger
+
+from load_config import load_avito_config
+from parser.viewed.factory import build_viewed_store
+from parser.viewed.snapshot import merge_into_store, merge_sorted, read_snapshot, write_snapshot
+
+
+def export_snapshot(args) -> None:
+    config = load_avito_config(args.config)
+    store = build_viewed_store(config=config)
+    started = time.perf_counter()
+    count = write_snapshot(args.path, store.iter_pairs())
+    store.close()
+    logger.info(f"В {args.path} выгружено {count} пар за {time.perf_counter() - started:.1f} сек.")
+
+
+def merge_snapshots(args) -> None:
+    started = time.perf_counter()
+    if args.output:
+        count = write_snapshot(args.output, merge_sorted(*(read_snapshot(path) for path in args.paths)))
+        logger.info(f"В {args.output} записано {count} пар за {time.perf_counter() - started:.1f} сек.")
+        return
+
+    config = load_avito_config(args.config)
+    store = build_viewed_store(config=config)
+    added = merge_into_store(store, args.paths)
+    store.close()
+    logger.info(f"В хранилище добавлено {added} пар за {time.perf_counter() - started:.1f} сек.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config.toml")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="выгрузить просмотренные в снимок")
+    export_cmd.add_argument("path")
+    export_cmd.set_defaults(handler=export_snapshot)
+
+    merge_cmd = commands.add_parser("merge", help="объединить снимки с хранилищем или между собой")
+    merge_cmd.add_argument("paths", nargs="+")
+    merge_cmd.add_argument("-o", "--output", help="записать результат в файл, а не в хранилище")
+    merge_cmd.set_defaults(handler=merge_snapshots)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()